@@ -4,10 +4,38 @@ from __future__ import annotations
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.const import Platform
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
+from .const import (
+    AFFECTED_LOCATIONS,
+    DOMAIN,
+    FORECAST_COORDINATOR,
+    SIGNAL_AFFECTED_LOCATIONS,
+)
+from .coordinator import ForecastCoordinator
+from .imagecache import async_get_image_cache, async_remove_image_stores
+from .services import async_setup_services
 
-PLATFORMS: list[Platform] = [Platform.WEATHER, Platform.SENSOR, Platform.SELECT, Platform.IMAGE]
+# Location entries carry a location ID, the warnings entry has empty data
+LOCATION_PLATFORMS: list[Platform] = [Platform.WEATHER, Platform.SENSOR]
+WARNINGS_PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.SELECT, Platform.IMAGE]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the domain-level objects shared by all config entries."""
+    # Created outside of any config entry so unloading one location
+    # does not shut down the coordinator used by the others.
+    hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN][FORECAST_COORDINATOR] = ForecastCoordinator(hass)
+    async_setup_services(hass)
+    return True
+
+def _entry_platforms(entry: ConfigEntry) -> list[Platform]:
+    """Return the platforms used by a config entry."""
+    return LOCATION_PLATFORMS if entry.data else WARNINGS_PLATFORMS
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Malaysia Weather from a config entry."""
@@ -16,12 +44,26 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "icon": "mdi:weather-partly-cloudy"
     }
     
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await hass.config_entries.async_forward_entry_setups(
+        entry, _entry_platforms(entry)
+    )
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(
+        entry, _entry_platforms(entry)
+    )
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
-    return unload_ok
\ No newline at end of file
+        if not entry.data and hass.data[DOMAIN].pop(AFFECTED_LOCATIONS, None):
+            # Warnings are no longer tracked, clear them from the locations
+            async_dispatcher_send(hass, SIGNAL_AFFECTED_LOCATIONS)
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the cached imagery when the warnings entry is removed."""
+    if entry.data:
+        return
+    await async_remove_image_stores(hass)
+    await async_get_image_cache(hass).async_clear()
@@ -0,0 +1,151 @@
+"""HTTP client for Malaysia Weather integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from time import monotonic, perf_counter
+from typing import Any
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util.json import json_loads
+
+from .const import (
+    API_CLIENT,
+    DOMAIN,
+    REQUEST_TIMEOUT,
+    RESPONSE_MEMO_TTL,
+)
+from .metrics import Metrics, async_get_metrics
+from .scheduler import HostScheduler
+
+_RequestKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+class MalaysiaWeatherApi:
+    """Integration-wide HTTP client for data.gov.my and MET Malaysia.
+
+    Requests go through Home Assistant's shared client session, whose
+    connector keeps connections alive and caches DNS lookups. On top of that
+    each host has a scheduler that caps concurrent requests, so a burst of
+    refreshes reuses a few pooled connections, and enforces the host's rate
+    budget, 429 backoff and circuit breaker for every caller.
+
+    Concurrent JSON requests for the same URL and query share a single
+    fetch, and its decoded result is memoized briefly so back-to-back
+    callers share it too. Callers must not mutate the returned documents.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, session: aiohttp.ClientSession, metrics: Metrics
+    ) -> None:
+        """Initialize the client."""
+        self._hass = hass
+        self._session = session
+        self._metrics = metrics
+        self._hosts: dict[str, HostScheduler] = {}
+        self._in_flight: dict[_RequestKey, asyncio.Task[Any]] = {}
+        self._memo: dict[_RequestKey, tuple[float, Any]] = {}
+
+    def _host(self, url: str) -> HostScheduler:
+        """Return the scheduler for the host of a URL."""
+        host = urlsplit(url).hostname or ""
+        if (scheduler := self._hosts.get(host)) is None:
+            scheduler = self._hosts[host] = HostScheduler(host)
+        return scheduler
+
+    @asynccontextmanager
+    async def async_request(
+        self, method: str, url: str, *, timeout: float = REQUEST_TIMEOUT, **kwargs: Any
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Perform a request, holding a per-host slot until it is consumed.
+
+        The timeout covers the request until the response is consumed, not
+        the wait for a slot.
+        """
+        metrics = self._metrics.endpoint(url)
+        async with self._host(url).async_slot(timeout) as host:
+            received = False
+            started = perf_counter()
+            try:
+                async with self._session.request(method, url, **kwargs) as response:
+                    received = True
+                    metrics.record_response(response.status, perf_counter() - started)
+                    host.observe(response)
+                    yield response
+            finally:
+                # Timeouts arrive here as a cancellation, count every kind
+                if not received:
+                    metrics.record_error()
+
+    async def async_get_json(
+        self,
+        url: str,
+        params: dict[str, str] | None = None,
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> Any:
+        """Fetch and decode a JSON document, coalescing identical requests."""
+        key: _RequestKey = (url, tuple(sorted((params or {}).items())))
+        now = monotonic()
+        if (memo := self._memo.get(key)) is not None and memo[0] > now:
+            self._metrics.endpoint(url).cache_hits += 1
+            return memo[1]
+
+        if (task := self._in_flight.get(key)) is not None:
+            self._metrics.endpoint(url).coalesced += 1
+        else:
+            # Tracked by Home Assistant, so it is cancelled on shutdown
+            task = self._in_flight[key] = self._hass.async_create_background_task(
+                self._async_fetch_json(url, params, timeout), f"{DOMAIN} fetch {url}"
+            )
+            task.add_done_callback(lambda task: self._async_fetched(key, task))
+        # A cancelled caller must not cancel the fetch shared with the others
+        return await asyncio.shield(task)
+
+    def _async_fetched(self, key: _RequestKey, task: asyncio.Task[Any]) -> None:
+        """Release a finished fetch and memoize its result."""
+        del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        now = monotonic()
+        self._memo = {
+            memo_key: memo
+            for memo_key, memo in self._memo.items()
+            if memo[0] > now
+        }
+        self._memo[key] = (now + RESPONSE_MEMO_TTL, task.result())
+
+    async def _async_fetch_json(
+        self, url: str, params: dict[str, str] | None, timeout: float
+    ) -> Any:
+        """Fetch and decode a JSON document."""
+        async with self.async_request(
+            "GET", url, params=params, timeout=timeout
+        ) as response:
+            response.raise_for_status()
+            body = await response.read()
+        metrics = self._metrics.endpoint(url)
+        metrics.bytes += len(body)
+        started = perf_counter()
+        data = json_loads(body)
+        metrics.last_decode_time = perf_counter() - started
+        return data
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the state of the per-host schedulers."""
+        return {host: scheduler.as_dict() for host, scheduler in self._hosts.items()}
+
+
+@callback
+def async_get_api(hass: HomeAssistant) -> MalaysiaWeatherApi:
+    """Return the shared API client, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (api := domain_data.get(API_CLIENT)) is None:
+        api = domain_data[API_CLIENT] = MalaysiaWeatherApi(
+            hass, async_get_clientsession(hass), async_get_metrics(hass)
+        )
+    return api
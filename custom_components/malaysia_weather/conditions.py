@@ -0,0 +1,72 @@
+"""Forecast condition classification for Malaysia Weather integration."""
+from __future__ import annotations
+
+from collections import Counter, OrderedDict
+from collections.abc import Iterable
+import logging
+
+from .const import CONDITION_CACHE_SIZE, CONDITION_KEYWORDS
+from .matcher import normalize_text
+
+_LOGGER = logging.getLogger(__name__)
+
+UNKNOWN_CONDITION = "unknown"
+
+
+class ConditionClassifier:
+    """Map MET forecast phrases to Home Assistant weather conditions.
+
+    Phrases are normalized and tokenized, then matched against a keyword
+    table indexed by first token, so new qualifiers and spacing still
+    resolve. Results are kept in a bounded LRU, and phrases that match no
+    keyword are counted for diagnostics.
+    """
+
+    def __init__(
+        self,
+        keywords: Iterable[tuple[str, str]] = CONDITION_KEYWORDS,
+        cache_size: int = CONDITION_CACHE_SIZE,
+    ) -> None:
+        """Compile the keyword table, earlier keywords take priority."""
+        self._rules: dict[str, list[tuple[int, tuple[str, ...], str]]] = {}
+        for priority, (phrase, condition) in enumerate(keywords):
+            tokens = tuple(normalize_text(phrase).split())
+            self._rules.setdefault(tokens[0], []).append(
+                (priority, tokens, condition)
+            )
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._cache_size = cache_size
+        self.unmapped: Counter[str] = Counter()
+
+    def classify(self, summary: str | None) -> str:
+        """Return the condition for a forecast phrase."""
+        if not summary:
+            return UNKNOWN_CONDITION
+        if (condition := self._cache.get(summary)) is not None:
+            self._cache.move_to_end(summary)
+        else:
+            condition = self._match(summary)
+            self._cache[summary] = condition
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+            if condition == UNKNOWN_CONDITION:
+                # Counted on cache misses only, so state reads do not inflate it
+                if summary not in self.unmapped:
+                    _LOGGER.debug("No condition for forecast %r", summary)
+                self.unmapped[summary] += 1
+        return condition
+
+    def _match(self, summary: str) -> str:
+        """Return the condition of the highest priority keyword in a phrase."""
+        tokens = normalize_text(summary).split()
+        best: tuple[int, str] | None = None
+        for index, token in enumerate(tokens):
+            for priority, phrase, condition in self._rules.get(token, ()):
+                if (best is None or priority < best[0]) and tuple(
+                    tokens[index : index + len(phrase)]
+                ) == phrase:
+                    best = (priority, condition)
+        return UNKNOWN_CONDITION if best is None else best[1]
+
+
+CONDITION_CLASSIFIER = ConditionClassifier()
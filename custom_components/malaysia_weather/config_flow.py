@@ -4,7 +4,6 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-import aiohttp
 import voluptuous as vol
 
 from homeassistant import config_entries
@@ -12,7 +11,8 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN, FORECAST_URL, CONF_LOCATION_ID, CONF_LOCATION_NAME
+from .const import DOMAIN, CONF_LOCATION_ID, CONF_LOCATION_NAME
+from .locations import async_get_location_catalogue
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -48,19 +48,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 self._abort_if_unique_id_configured()
     
                 # Validate the location exists
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        f"{FORECAST_URL}?contains={user_input[CONF_LOCATION_ID]}@location__location_id"
-                    ) as response:
-                        if response.status != 200:
-                            raise InvalidLocation
-                        data = await response.json()
-                        if not data:
-                            raise InvalidLocation
-                        
-                        # Get the location name from the API response
-                        location_name = data[0]["location"]["location_name"].split(" (")[0]
-                        
+                location_name = await _async_validate_location(
+                    self.hass, user_input[CONF_LOCATION_ID]
+                )
+
                 return self.async_create_entry(
                     title=location_name,
                     data={
@@ -77,7 +68,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors["base"] = "unknown"
     
         # Get available locations from API
-        locations = await self._async_get_locations()
+        locations = await self._async_get_locations(self.hass)
         
         return self.async_show_form(
             step_id="location",
@@ -88,35 +79,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
     @staticmethod
-    async def _async_get_locations() -> dict[str, str]:
-        """Get available locations from the API."""
-        locations = {}
-        seen_location_names = set()
+    async def _async_get_locations(hass: HomeAssistant) -> dict[str, str]:
+        """Get available locations, deduplicated and sorted by name."""
+        catalogue = async_get_location_catalogue(hass)
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(FORECAST_URL) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        for item in data:
-                            location_id = item["location"]["location_id"]
-                            location_name = item["location"]["location_name"].split(" (")[0]
-                            if location_name not in seen_location_names:
-                                seen_location_names.add(location_name)
-                                locations[location_id] = location_name
+            await catalogue.async_load()
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception("Error fetching locations")
-       
-        # 5/1/25 - Clean up any existing duplicates in the locations dictionary
-        cleaned_locations = {}
-        seen_location_names = set()
-        for location_id, location_name in locations.items():
-            if location_name not in seen_location_names:
-                seen_location_names.add(location_name)
-                cleaned_locations[location_id] = location_name
-    
-        # 5/1/25 - Sort locations alphabetically by name
-        sorted_locations = dict(sorted(locations.items(), key=lambda x: x[1]))
-        return sorted_locations        
+        return catalogue.options
     
     @staticmethod
     @callback
@@ -146,18 +116,9 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
             try:
                 # Validate the location exists
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        f"{FORECAST_URL}?contains={user_input[CONF_LOCATION_ID]}@location__location_id"
-                    ) as response:
-                        if response.status != 200:
-                            raise InvalidLocation
-                        data = await response.json()
-                        if not data:
-                            raise InvalidLocation
-                        
-                        # Get the location name from the API response
-                        location_name = data[0]["location"]["location_name"].split(" (")[0]
+                location_name = await _async_validate_location(
+                    self.hass, user_input[CONF_LOCATION_ID]
+                )
 
                 # Update the config entry with new location
                 self.hass.config_entries.async_update_entry(
@@ -177,7 +138,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 errors["base"] = "unknown"
 
         # Get available locations from API
-        locations = await ConfigFlow._async_get_locations()
+        locations = await ConfigFlow._async_get_locations(self.hass)
 
         return self.async_show_form(
             step_id="init",
@@ -191,5 +152,14 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         )
 
 
+async def _async_validate_location(hass: HomeAssistant, location_id: str) -> str:
+    """Validate a location ID against the catalogue and return its name."""
+    catalogue = async_get_location_catalogue(hass)
+    await catalogue.async_load()
+    if (location_name := catalogue.get_name(location_id)) is None:
+        raise InvalidLocation
+    return location_name
+
+
 class InvalidLocation(HomeAssistantError):
     """Error to indicate the location ID is invalid."""
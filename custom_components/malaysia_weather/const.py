@@ -6,6 +6,34 @@ DOMAIN: Final = "malaysia_weather"
 CONF_LOCATION_ID: Final = "location_id"
 CONF_LOCATION_NAME: Final = "location_name"
 
+# Keys for domain-level objects shared by all config entries
+FORECAST_COORDINATOR: Final = "forecast_coordinator"
+API_CLIENT: Final = "api_client"
+LOCATION_CATALOGUE: Final = "location_catalogue"
+AFFECTED_LOCATIONS: Final = "affected_locations"
+IMAGE_CACHE: Final = "image_cache"
+FRAME_HISTORIES: Final = "frame_histories"
+WARNING_COORDINATOR: Final = "warning_coordinator"
+METRICS: Final = "metrics"
+
+# Keys for per-entry data
+SELECTED_IMAGERY: Final = "selected_imagery"
+EARTHQUAKE_COORDINATOR: Final = "earthquake_coordinator"
+
+# Events fired once per new warning or earthquake
+EVENT_WARNING_ISSUED: Final = f"{DOMAIN}_warning_issued"
+EVENT_WARNING_EXPIRED: Final = f"{DOMAIN}_warning_expired"
+EVENT_EARTHQUAKE: Final = f"{DOMAIN}_earthquake"
+EVENT_SEEN_MAX: Final = 500  # event keys remembered for deduplication
+
+# Dispatcher signals
+SIGNAL_IMAGERY_SELECTED: Final = f"{DOMAIN}_imagery_selected"
+SIGNAL_FRAMES_UPDATED: Final = f"{DOMAIN}_frames_updated"
+SIGNAL_AFFECTED_LOCATIONS: Final = f"{DOMAIN}_affected_locations"
+
+# Forecast dates are published in Malaysia time
+TIMEZONE: Final = "Asia/Kuala_Lumpur"
+
 # API URLs
 FORECAST_URL: Final = "https://api.data.gov.my/weather/forecast"
 WARNING_URL: Final = "https://api.data.gov.my/weather/warning"
@@ -18,6 +46,50 @@ SATELLITE_URLS = {
     "Thunderstorm Warning": "https://www.met.gov.my/data/AmaranRibutPetir.jpg",
 }
 
+# HTTP client
+REQUEST_TIMEOUT: Final = 10  # seconds
+FORECAST_REQUEST_TIMEOUT: Final = 30  # seconds, the full dataset is larger
+# Identical requests made within this many seconds share one response
+RESPONSE_MEMO_TTL: Final = 5
+MAX_CONNECTIONS_PER_HOST: Final = 4
+
+# Request scheduling, per host
+RATE_LIMIT_PER_SECOND: Final = 1.0  # sustained requests per second
+RATE_LIMIT_BURST: Final = 10  # requests allowed back to back
+RATE_LIMIT_BACKOFF_INITIAL: Final = 30  # seconds, when 429 has no Retry-After
+RATE_LIMIT_BACKOFF_MAX: Final = 900  # 15 minutes
+CIRCUIT_FAILURE_THRESHOLD: Final = 5  # consecutive failures before opening
+CIRCUIT_OPEN_INITIAL: Final = 60  # seconds
+CIRCUIT_OPEN_MAX: Final = 900  # 15 minutes
+# Revalidation of cached data is spread over this window after startup
+STARTUP_JITTER: Final = 30  # seconds
+
+# Last good payloads are written to storage this long after a refresh
+CACHE_SAVE_DELAY: Final = 10  # seconds
+
+# The list of forecast locations rarely changes
+LOCATION_CATALOGUE_TTL: Final = 604800  # 7 days
+
+# Imagery that is not selected is only fetched on view, then kept this long
+IMAGE_IDLE_TTL: Final = 600  # 10 minutes
+IMAGE_REQUEST_TIMEOUT: Final = 60  # seconds, for the whole download
+IMAGE_MAX_BYTES: Final = 20971520  # 20 MiB
+IMAGE_CHUNK_SIZE: Final = 262144  # 256 KiB
+IMAGE_WRITE_BUFFER: Final = 1048576  # 1 MiB, downloads are written in batches
+
+# Recent distinct frames kept per imagery product for the time-lapse
+FRAME_HISTORY_SIZE: Final = 12
+FRAME_HISTORY_MAX_AGE: Final = 10800  # 3 hours
+TIMELAPSE_FRAME_DELAY: Final = 50  # hundredths of a second
+TIMELAPSE_MAX_SIZE: Final = 800  # pixels, longest side of a frame
+
+# Lighter JPEG renditions of each image, by longest side (0 keeps the size)
+IMAGE_RENDITIONS: Final = {"thumbnail": 160, "medium": 480, "still": 0}
+IMAGE_RENDITION_QUALITY: Final = 80
+
+# Request latencies kept per endpoint for percentiles
+METRICS_LATENCY_SAMPLES: Final = 100
+
 # Default icon
 DEFAULT_ICON = "mdi:weather-partly-cloudy"
 
@@ -30,25 +102,48 @@ LOCATION_TYPES = {
     "Dv": "Division"
 }
 
-# Weather condition mapping
-CONDITION_MAPPING = {
-    "Berjerebu": "fog",
-    "Tiada hujan": "sunny",
-    "Hujan": "rainy",
-    "Hujan di beberapa tempat": "rainy",
-    "Hujan di satu dua tempat": "rainy",
-    "Hujan di satu dua tempat di kawasan pantai": "rainy",
-    "Hujan di satu dua tempat di kawasan pedalaman": "rainy",
-    "Ribut petir": "lightning-rainy",
-    "Ribut petir di beberapa tempat": "lightning-rainy",
-    "Ribut petir di satu dua tempat": "lightning-rainy",
-    "Ribut petir di satu dua tempat di kawasan pantai": "lightning-rainy",
-    "Ribut petir di satu dua tempat di kawasan pedalaman": "lightning-rainy",
-}
+# Weather condition keywords, the first phrase found in a forecast wins.
+# Qualifiers such as "di beberapa tempat" or "di kawasan pantai" are ignored.
+CONDITION_KEYWORDS: Final = (
+    ("ribut petir", "lightning-rainy"),
+    ("petir", "lightning-rainy"),
+    ("tiada hujan", "sunny"),
+    ("hujan lebat", "pouring"),
+    ("hujan", "rainy"),
+    ("berjerebu", "fog"),
+    ("jerebu", "fog"),
+    ("berkabus", "fog"),
+    ("kabus", "fog"),
+    ("angin kencang", "windy"),
+    ("berangin", "windy"),
+    ("sebahagian berawan", "partlycloudy"),
+    ("berawan", "cloudy"),
+    ("mendung", "cloudy"),
+    ("cerah", "sunny"),
+)
+CONDITION_CACHE_SIZE: Final = 256
 
 # Attribution
 ATTRIBUTION: Final = "Weather forecast from Malaysia open data portal, delivered by Malaysian Meteorological Department (MET)"
 
 # Update intervals (in seconds)
 UPDATE_INTERVAL_FORECAST: Final = 3600  # 1 hour, since forecast updates daily
-UPDATE_INTERVAL_WARNINGS: Final = 300   # 5 minutes, since warnings update when required
\ No newline at end of file
+
+# Publication-aligned forecast refresh (in seconds unless noted)
+FORECAST_PUBLICATION_TIMES: Final = ("06:00",)  # Malaysia time, until one is learned
+FORECAST_PUBLICATION_DELAY: Final = 900  # fetch 15 minutes after publication
+FORECAST_RETRY_INITIAL: Final = 600  # first retry while a new issue is overdue
+FORECAST_RETRY_MAX: Final = 3600  # retries back off up to 1 hour
+FORECAST_MAX_IDLE: Final = 21600  # never sleep longer than 6 hours
+UPDATE_INTERVAL_WARNINGS: Final = 300   # 5 minutes, since warnings update when required
+
+# Adaptive warning and earthquake polling (in seconds)
+UPDATE_INTERVAL_WARNINGS_ACTIVE: Final = 60  # while a warning or recent quake is active
+UPDATE_INTERVAL_WARNINGS_MAX: Final = 1800  # quiet periods back off up to 30 minutes
+UPDATE_INTERVAL_WARNINGS_MIN: Final = 15  # never poll faster than this
+WARNING_BOUNDARY_MARGIN: Final = 5  # refresh just after valid_from / valid_to
+EARTHQUAKE_ACTIVE_WINDOW: Final = 3600  # a quake keeps polling tight for 1 hour
+
+# Recent earthquakes kept for local queries
+EARTHQUAKE_HISTORY_SIZE: Final = 256
+EARTHQUAKE_BACKFILL: Final = 2592000  # 30 days fetched when there is no history
\ No newline at end of file
@@ -0,0 +1,595 @@
+"""Data update coordinators for Malaysia Weather integration."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import asyncio
+from datetime import date, datetime, time, timedelta
+import logging
+from time import perf_counter
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .api import async_get_api
+from .const import (
+    AFFECTED_LOCATIONS,
+    CACHE_SAVE_DELAY,
+    CONF_LOCATION_ID,
+    CONF_LOCATION_NAME,
+    DOMAIN,
+    EARTHQUAKE_ACTIVE_WINDOW,
+    EARTHQUAKE_BACKFILL,
+    EARTHQUAKE_HISTORY_SIZE,
+    EARTHQUAKE_URL,
+    EVENT_EARTHQUAKE,
+    EVENT_WARNING_EXPIRED,
+    EVENT_WARNING_ISSUED,
+    FORECAST_MAX_IDLE,
+    FORECAST_PUBLICATION_DELAY,
+    FORECAST_PUBLICATION_TIMES,
+    FORECAST_REQUEST_TIMEOUT,
+    FORECAST_RETRY_INITIAL,
+    FORECAST_RETRY_MAX,
+    FORECAST_URL,
+    SIGNAL_AFFECTED_LOCATIONS,
+    TIMEZONE,
+    UPDATE_INTERVAL_FORECAST,
+    UPDATE_INTERVAL_WARNINGS,
+    UPDATE_INTERVAL_WARNINGS_ACTIVE,
+    UPDATE_INTERVAL_WARNINGS_MAX,
+    UPDATE_INTERVAL_WARNINGS_MIN,
+    WARNING_BOUNDARY_MARGIN,
+    WARNING_URL,
+)
+from .events import SeenEvents
+from .locations import async_get_location_catalogue
+from .matcher import LocationMatcher
+from .metrics import async_get_metrics
+from .query import (
+    EARTHQUAKE_COLUMNS,
+    FORECAST_COLUMNS,
+    WARNING_COLUMNS,
+    ApiQuery,
+    malaysia_today,
+)
+from .scheduler import phase_offset
+from .models import (
+    Earthquake,
+    EarthquakeHistory,
+    LocationForecast,
+    WarningSet,
+    parse_forecasts,
+    parse_warnings,
+)
+
+_LOGGER = logging.getLogger(__name__)
+STORAGE_VERSION = 1
+
+_DataT = TypeVar("_DataT")
+
+
+class CachedCoordinator(DataUpdateCoordinator[_DataT], ABC):
+    """Coordinator that persists its last good payload.
+
+    On setup the cached payload is restored straight away and a live refresh
+    runs in the background, so entities do not wait for the API. Data that
+    has not been confirmed by a live refresh is reported as stale. A refresh
+    that parses to the same data keeps the previous object and does not
+    notify listeners, so unchanged payloads cause no state writes.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        name: str,
+        update_interval: timedelta,
+        storage_key: str,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=name,
+            update_interval=update_interval,
+            always_update=False,
+        )
+        self._api = async_get_api(hass)
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{storage_key}"
+        )
+        self._restored = False
+        self._metrics = async_get_metrics(hass).named(storage_key)
+        self.data_fetched_at: datetime | None = None
+
+    @property
+    def stale(self) -> bool:
+        """Return True if data is served from cache or after a failed update."""
+        return self.data is not None and (
+            self._restored or not self.last_update_success
+        )
+
+    @property
+    def cache_attributes(self) -> dict[str, Any]:
+        """Return attributes describing the age of the data."""
+        return {
+            "data_fetched_at": self.data_fetched_at.isoformat()
+            if self.data_fetched_at
+            else None,
+            "stale": self.stale,
+        }
+
+    async def async_restore_or_refresh(self) -> None:
+        """Restore cached data and revalidate it, or refresh if nothing is cached."""
+        if await self._async_restore():
+            self.hass.async_create_background_task(
+                self._async_revalidate(), f"{self.name} revalidate"
+            )
+            return
+        await self.async_refresh()
+        if self.data is None:
+            raise ConfigEntryNotReady(f"Unable to fetch data for {self.name}")
+
+    async def _async_revalidate(self) -> None:
+        """Refresh restored data after a random delay.
+
+        Every coordinator restores at startup, the delay keeps them from
+        hitting the API in the same second.
+        """
+        await asyncio.sleep(phase_offset())
+        await self.async_refresh()
+
+    async def _async_restore(self) -> bool:
+        """Load the cached payload, return True if one was restored."""
+        if (stored := await self._store.async_load()) is None:
+            return False
+        try:
+            payload = stored["data"]
+            fetched_at = dt_util.parse_datetime(stored["fetched_at"])
+        except (KeyError, TypeError):
+            return False
+        self.data = self._parse(payload)
+        self.data_fetched_at = fetched_at
+        self._restored = True
+        self._restore_extras(stored)
+        return True
+
+    async def _async_update_data(self) -> _DataT:
+        """Fetch fresh data and schedule saving it to the cache."""
+        payload = await self._async_fetch()
+        started = perf_counter()
+        data = self._parse(payload)
+        self._metrics.record_parse(perf_counter() - started)
+        if data == self.data:
+            # Keep the previous object and anything memoized on it
+            data = self.data
+        fetched_at = self.data_fetched_at = dt_util.utcnow()
+        # Notify listeners once when leaving the cache, even if data is equal,
+        # so the stale attribute is cleared
+        self.always_update = self._restored
+        self._restored = False
+        self._store.async_delay_save(
+            lambda: {
+                "fetched_at": fetched_at.isoformat(),
+                "data": self._cache_payload(data),
+                **self._cache_extras(),
+            },
+            CACHE_SAVE_DELAY,
+        )
+        return data
+
+    def _cache_payload(self, data: _DataT) -> Any:
+        """Return what to persist so that parsing it restores the data.
+
+        The cache is built from the parsed data when it is saved, so the raw
+        payload is released as soon as it is parsed. By default the data is
+        stored as is, which suits coordinators that do not parse.
+        """
+        return data
+
+    def _cache_extras(self) -> dict[str, Any]:
+        """Return extra state to persist along with the payload."""
+        return {}
+
+    def _restore_extras(self, stored: dict[str, Any]) -> None:
+        """Restore extra state persisted along with the payload."""
+
+    @abstractmethod
+    async def _async_fetch(self) -> Any:
+        """Fetch the raw payload from the API."""
+
+    def _parse(self, payload: Any) -> _DataT:
+        """Convert a raw payload into coordinator data."""
+        return payload
+
+
+class ForecastCoordinator(CachedCoordinator[dict[str, LocationForecast]]):
+    """Fetch the forecast dataset once and split it by location.
+
+    A single instance is shared by every location config entry, so adding
+    a location does not add any requests to the upstream API.
+
+    MET publishes the forecast once a day, so instead of a fixed interval the
+    coordinator sleeps until shortly after the expected publication time,
+    then retries with backoff until a newer forecast date shows up. The
+    publication time is learned from when new issues are first seen.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            name="malaysia_weather_forecast",
+            update_interval=timedelta(seconds=UPDATE_INTERVAL_FORECAST),
+            storage_key="forecast",
+        )
+        self._first_refresh_lock = asyncio.Lock()
+        self._newest_date: date | None = None
+        self._issue_seen_at: datetime | None = None
+        self._last_attempt: datetime | None = None
+        self._retries = 0
+        self.publication_time: time | None = None
+
+    async def async_ensure_first_refresh(self) -> None:
+        """Load data once for the first location entry, reuse it afterwards."""
+        async with self._first_refresh_lock:
+            if self.data is None:
+                await self.async_restore_or_refresh()
+
+    async def _async_fetch(self) -> list[dict[str, Any]]:
+        """Fetch the forecast columns in use, from today onward."""
+        query = ApiQuery(FORECAST_COLUMNS).dates("date", start=malaysia_today())
+        return await self._api.async_get_json(
+            FORECAST_URL, params=query.params, timeout=FORECAST_REQUEST_TIMEOUT
+        )
+
+    def _parse(self, payload: list[dict[str, Any]]) -> dict[str, LocationForecast]:
+        """Parse the dataset once per refresh, grouped by location ID."""
+        return parse_forecasts(payload)
+
+    def _cache_payload(
+        self, data: dict[str, LocationForecast]
+    ) -> list[dict[str, Any]]:
+        """Persist the parsed days in the shape of the dataset."""
+        return [record for forecast in data.values() for record in forecast.as_records()]
+
+    async def _async_restore(self) -> bool:
+        """Restore cached data and the issue it belongs to."""
+        if not await super()._async_restore():
+            return False
+        self._track_issue(self.data, self.data_fetched_at, None)
+        return True
+
+    def _cache_extras(self) -> dict[str, Any]:
+        """Persist the learned publication time."""
+        if self.publication_time is None:
+            return {}
+        return {"publication_time": self.publication_time.isoformat()}
+
+    def _restore_extras(self, stored: dict[str, Any]) -> None:
+        """Restore the learned publication time."""
+        if value := stored.get("publication_time"):
+            self.publication_time = time.fromisoformat(value)
+
+    async def _async_update_data(self) -> dict[str, LocationForecast]:
+        """Fetch data and schedule the next refresh around publication."""
+        now = dt_util.utcnow()
+        last_attempt, self._last_attempt = self._last_attempt, now
+        try:
+            data = await super()._async_update_data()
+        except Exception:
+            self.update_interval = timedelta(seconds=FORECAST_RETRY_INITIAL)
+            raise
+        self._track_issue(data, now, last_attempt)
+        self.update_interval = self._next_interval(now)
+        return data
+
+    def _track_issue(
+        self,
+        data: dict[str, LocationForecast],
+        seen_at: datetime | None,
+        last_attempt: datetime | None,
+    ) -> None:
+        """Record when a new forecast issue, i.e. a newer last date, appears."""
+        newest = max(
+            (forecast.days[-1].date for forecast in data.values() if forecast.days),
+            default=None,
+        )
+        if newest is None or (
+            self._newest_date is not None and newest <= self._newest_date
+        ):
+            return
+        if (
+            self._newest_date is not None
+            and last_attempt is not None
+            and seen_at - last_attempt <= timedelta(seconds=FORECAST_RETRY_MAX)
+        ):
+            # Published between the last two attempts, learn the midpoint
+            published = last_attempt + (seen_at - last_attempt) / 2
+            self.publication_time = (
+                published.astimezone(dt_util.get_time_zone(TIMEZONE))
+                .time()
+                .replace(second=0, microsecond=0)
+            )
+            _LOGGER.debug("Learned forecast publication time %s", self.publication_time)
+        self._newest_date = newest
+        self._issue_seen_at = seen_at
+
+    def _next_interval(self, now: datetime) -> timedelta:
+        """Return the interval until the next refresh."""
+        timezone = dt_util.get_time_zone(TIMEZONE)
+        local_now = now.astimezone(timezone)
+        times = (
+            [self.publication_time]
+            if self.publication_time is not None
+            else [time.fromisoformat(value) for value in FORECAST_PUBLICATION_TIMES]
+        )
+        publications = [
+            datetime.combine(local_now.date() + timedelta(days=offset), value, timezone)
+            for offset in (-1, 0, 1)
+            for value in times
+        ]
+        previous = max(when for when in publications if when <= local_now)
+        following = min(when for when in publications if when > local_now)
+
+        if self._issue_seen_at is not None and self._issue_seen_at >= previous:
+            # Up to date, idle until the next issue is due
+            self._retries = 0
+            interval = min(
+                (following - local_now).total_seconds() + FORECAST_PUBLICATION_DELAY,
+                FORECAST_MAX_IDLE,
+            )
+        else:
+            # The issue due at the last publication time has not appeared yet
+            interval = min(
+                FORECAST_RETRY_INITIAL * 2**self._retries, FORECAST_RETRY_MAX
+            )
+            self._retries = min(self._retries + 1, 16)
+        return timedelta(seconds=interval)
+
+
+class AdaptiveCoordinator(CachedCoordinator[_DataT]):
+    """Coordinator that adapts its poll interval to the events it sees.
+
+    While an event is active the interval is tightened, quiet refreshes back
+    off exponentially, and a known upcoming boundary (e.g. a warning's
+    valid_from or valid_to) always gets a refresh right after it passes.
+
+    Each live refresh also fires bus events for new events, deduplicated
+    against a persisted set of keys so restarts and re-polls of the same
+    event do not fire again.
+    """
+
+    def __init__(self, hass: HomeAssistant, *, name: str, storage_key: str) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            name=name,
+            update_interval=timedelta(seconds=UPDATE_INTERVAL_WARNINGS),
+            storage_key=storage_key,
+        )
+        self._quiet_refreshes = 0
+        self._seen_events = SeenEvents(hass, f"{storage_key}_events")
+
+    async def async_restore_or_refresh(self) -> None:
+        """Load the fired event keys before the first refresh."""
+        await self._seen_events.async_load()
+        await super().async_restore_or_refresh()
+
+    async def _async_update_data(self) -> _DataT:
+        """Fetch data, fire new events and pick the next interval."""
+        previous = self.data
+        try:
+            data = await super()._async_update_data()
+        except Exception:
+            # Retry failures at the base rate rather than a backed-off one
+            self._quiet_refreshes = 0
+            self.update_interval = timedelta(seconds=UPDATE_INTERVAL_WARNINGS)
+            raise
+        self._fire_events(previous, data)
+        self.update_interval = self._next_interval(data)
+        return data
+
+    def _fire_events(self, previous: _DataT | None, data: _DataT) -> None:
+        """Fire bus events for events not seen before."""
+
+    def _next_interval(self, data: _DataT) -> timedelta:
+        """Return the interval until the next refresh."""
+        now = dt_util.utcnow()
+        active, boundaries = self._schedule_hints(data, now)
+        if active:
+            self._quiet_refreshes = 0
+            interval = float(UPDATE_INTERVAL_WARNINGS_ACTIVE)
+        else:
+            interval = min(
+                UPDATE_INTERVAL_WARNINGS * 2**self._quiet_refreshes,
+                UPDATE_INTERVAL_WARNINGS_MAX,
+            )
+            self._quiet_refreshes = min(self._quiet_refreshes + 1, 16)
+        if upcoming := [boundary for boundary in boundaries if boundary > now]:
+            until_boundary = (min(upcoming) - now).total_seconds()
+            interval = min(interval, until_boundary + WARNING_BOUNDARY_MARGIN)
+        return timedelta(seconds=max(interval, UPDATE_INTERVAL_WARNINGS_MIN))
+
+    @abstractmethod
+    def _schedule_hints(
+        self, data: _DataT, now: datetime
+    ) -> tuple[bool, list[datetime]]:
+        """Return whether an event is active and its known boundaries."""
+
+
+class WarningCoordinator(AdaptiveCoordinator[WarningSet]):
+    """Fetch the active weather warnings.
+
+    Each refresh is parsed into a WarningSet holding the warnings in force
+    at that time, so listeners are only notified when that set changes.
+
+    The warnings are also scanned once against the names of the configured
+    and catalogued locations, and the warnings affecting each configured
+    location are published for its weather entity.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass, name="malaysia_weather_warnings", storage_key="warnings"
+        )
+        self._matcher: LocationMatcher | None = None
+        self._matcher_key: tuple | None = None
+
+    async def async_restore_or_refresh(self) -> None:
+        """Load the location catalogue in the background for area matching."""
+        self.hass.async_create_background_task(
+            self._async_load_catalogue(), f"{self.name} location catalogue"
+        )
+        await super().async_restore_or_refresh()
+
+    async def _async_load_catalogue(self) -> None:
+        """Load the catalogue, warnings still match configured locations without it."""
+        try:
+            await async_get_location_catalogue(self.hass).async_load()
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug("Location catalogue unavailable for warning matching")
+
+    async def _async_fetch(self) -> list[dict[str, Any]]:
+        """Fetch the warning columns in use, for warnings valid from today."""
+        today = datetime.combine(
+            malaysia_today(), time(), dt_util.get_time_zone(TIMEZONE)
+        )
+        query = ApiQuery(WARNING_COLUMNS).since("valid_to", today)
+        return await self._api.async_get_json(WARNING_URL, params=query.params)
+
+    def _parse(self, payload: list[dict[str, Any]]) -> WarningSet:
+        """Index the warnings and resolve the ones in force now."""
+        warnings = parse_warnings(payload, dt_util.utcnow())
+        self._match_locations(warnings)
+        return warnings
+
+    def _cache_payload(self, data: WarningSet) -> list[dict[str, Any]]:
+        """Persist the parsed warnings in the shape of the dataset."""
+        return data.as_records()
+
+    def _location_matcher(self, configured: dict[str, str]) -> LocationMatcher:
+        """Return the matcher, recompiled only when the location names change."""
+        catalogue = async_get_location_catalogue(self.hass)
+        key = (tuple(configured.items()), catalogue.version)
+        if self._matcher is None or key != self._matcher_key:
+            self._matcher = LocationMatcher(
+                [*catalogue.locations.items(), *configured.items()]
+            )
+            self._matcher_key = key
+        return self._matcher
+
+    def _match_locations(self, warnings: WarningSet) -> None:
+        """Record the areas of each warning and publish affected locations."""
+        configured = {
+            entry.data[CONF_LOCATION_ID]: entry.data[CONF_LOCATION_NAME]
+            for entry in self.hass.config_entries.async_entries(DOMAIN)
+            if entry.data
+        }
+        names = {**async_get_location_catalogue(self.hass).locations, **configured}
+        matcher = self._location_matcher(configured)
+
+        affected: dict[str, list[dict[str, Any]]] = {}
+        for warning in warnings.warnings.values():
+            matched = matcher.match(f"{warning.heading or ''} {warning.text or ''}")
+            warning.areas = sorted({names[location_id] for location_id in matched})
+            if warning in warnings.active:
+                for location_id in matched & configured.keys():
+                    affected.setdefault(location_id, []).append(warning.heading)
+
+        if affected != self.hass.data[DOMAIN].get(AFFECTED_LOCATIONS):
+            self.hass.data[DOMAIN][AFFECTED_LOCATIONS] = affected
+            async_dispatcher_send(self.hass, SIGNAL_AFFECTED_LOCATIONS)
+
+    def _schedule_hints(
+        self, data: WarningSet, now: datetime
+    ) -> tuple[bool, list[datetime]]:
+        """Return whether a warning is in force and its validity bounds."""
+        return bool(data.active), data.boundaries
+
+    def _fire_events(self, previous: WarningSet | None, data: WarningSet) -> None:
+        """Fire issued events for new warnings and expired events when they end."""
+        issued = {
+            _event_key("issued", *warning.key): warning
+            for warning in data.warnings.values()
+        }
+        for key in self._seen_events.filter_new(issued):
+            self.hass.bus.async_fire(EVENT_WARNING_ISSUED, issued[key].as_dict())
+        if previous is None:
+            return
+        _, ended = data.diff(previous)
+        expired = {_event_key("expired", *warning.key): warning for warning in ended}
+        for key in self._seen_events.filter_new(expired):
+            self.hass.bus.async_fire(EVENT_WARNING_EXPIRED, expired[key].as_dict())
+
+
+class EarthquakeCoordinator(AdaptiveCoordinator[EarthquakeHistory]):
+    """Fetch the latest earthquake reports.
+
+    Reports are merged into an EarthquakeHistory ring buffer. Once it holds
+    any quake, only reports from an active window before the newest one are
+    requested, so late or out-of-order reports are still picked up.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass, name="malaysia_weather_earthquake", storage_key="earthquake"
+        )
+        self.history = EarthquakeHistory(EARTHQUAKE_HISTORY_SIZE)
+        self._added: list[Earthquake] = []
+
+    async def _async_fetch(self) -> list[dict[str, Any]]:
+        """Fetch earthquake reports newer than the ones already held."""
+        if (latest := self.history.latest) is not None:
+            # Overlap the newest quake, reports can arrive late or out of order
+            cursor = latest.occurred - timedelta(seconds=EARTHQUAKE_ACTIVE_WINDOW)
+        else:
+            cursor = dt_util.utcnow() - timedelta(seconds=EARTHQUAKE_BACKFILL)
+        query = ApiQuery(EARTHQUAKE_COLUMNS).since("localdatetime", cursor)
+        return await self._api.async_get_json(EARTHQUAKE_URL, params=query.params)
+
+    async def _async_update_data(self) -> EarthquakeHistory:
+        """Merge new reports, notifying listeners only when some arrived."""
+        data = await super()._async_update_data()
+        if self._added:
+            self.always_update = True
+        return data
+
+    def _parse(self, payload: list[dict[str, Any]]) -> EarthquakeHistory:
+        """Merge reports into the history, deduplicating the cursor overlap."""
+        self._added = self.history.ingest(payload)
+        return self.history
+
+    def _cache_payload(self, data: EarthquakeHistory) -> list[dict[str, Any]]:
+        """Persist the whole history rather than the last increment."""
+        return data.as_records()
+
+    def _schedule_hints(
+        self, data: EarthquakeHistory, now: datetime
+    ) -> tuple[bool, list[datetime]]:
+        """Return whether a quake was reported recently, aftershocks may follow."""
+        latest = data.latest
+        return (
+            latest is not None
+            and now - latest.occurred < timedelta(seconds=EARTHQUAKE_ACTIVE_WINDOW)
+        ), []
+
+    def _fire_events(
+        self, previous: EarthquakeHistory | None, data: EarthquakeHistory
+    ) -> None:
+        """Fire an event for each earthquake not reported before, oldest first."""
+        added = {quake.key: quake for quake in self._added}
+        for key in self._seen_events.filter_new(added):
+            self.hass.bus.async_fire(EVENT_EARTHQUAKE, added[key].as_dict())
+
+
+def _event_key(*parts: Any) -> str:
+    """Return a storable key identifying an event."""
+    return "|".join("" if part is None else str(part) for part in parts)
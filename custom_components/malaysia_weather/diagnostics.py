@@ -0,0 +1,85 @@
+"""Diagnostics support for Malaysia Weather integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .api import async_get_api
+from .conditions import CONDITION_CLASSIFIER
+from .const import (
+    AFFECTED_LOCATIONS,
+    CONF_LOCATION_ID,
+    DOMAIN,
+    EARTHQUAKE_COORDINATOR,
+    FORECAST_COORDINATOR,
+    FRAME_HISTORIES,
+    WARNING_COORDINATOR,
+)
+from .coordinator import CachedCoordinator
+from .metrics import async_get_metrics
+from .timelapse import FrameHistory
+
+
+def _coordinator_diagnostics(coordinator: CachedCoordinator) -> dict[str, Any]:
+    """Return the refresh state of a coordinator."""
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "last_exception": repr(coordinator.last_exception)
+        if coordinator.last_exception
+        else None,
+        "update_interval": coordinator.update_interval.total_seconds()
+        if coordinator.update_interval
+        else None,
+        **coordinator.cache_attributes,
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    domain_data = hass.data[DOMAIN]
+    entry_data = domain_data.get(entry.entry_id, {})
+    forecast = domain_data[FORECAST_COORDINATOR]
+    coordinators = {forecast.name: forecast}
+    diagnostics: dict[str, Any] = {"entry": {"title": entry.title, "data": dict(entry.data)}}
+
+    if location_id := entry.data.get(CONF_LOCATION_ID):
+        location = (forecast.data or {}).get(location_id)
+        diagnostics["forecast"] = [
+            {
+                "date": day.date.isoformat(),
+                "summary": day.summary,
+                "condition": day.condition,
+                "periods": list(day.periods),
+            }
+            for day in (location.days if location else [])
+        ]
+        diagnostics["active_warnings"] = domain_data.get(AFFECTED_LOCATIONS, {}).get(
+            location_id, []
+        )
+    else:
+        for key in (WARNING_COORDINATOR, EARTHQUAKE_COORDINATOR):
+            if (coordinator := entry_data.get(key)) is not None:
+                coordinators[coordinator.name] = coordinator
+        histories: dict[str, FrameHistory] = entry_data.get(FRAME_HISTORIES, {})
+        diagnostics["frame_histories"] = {
+            product: {
+                "frames": len(history.digests),
+                "updated": history.updated.isoformat() if history.updated else None,
+            }
+            for product, history in histories.items()
+        }
+
+    diagnostics["coordinators"] = {
+        name: _coordinator_diagnostics(coordinator)
+        for name, coordinator in coordinators.items()
+    }
+    diagnostics["unmapped_conditions"] = dict(
+        CONDITION_CLASSIFIER.unmapped.most_common()
+    )
+    diagnostics["hosts"] = async_get_api(hass).diagnostics()
+    diagnostics["metrics"] = async_get_metrics(hass).as_dict()
+    return diagnostics
@@ -0,0 +1,63 @@
+"""Base entities for Malaysia Weather integration."""
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import TIMEZONE
+from .coordinator import CachedCoordinator, ForecastCoordinator
+from .metrics import async_get_metrics
+from .models import DailyForecast, LocationForecast
+
+
+class MetricsEntity(Entity):
+    """Entity that counts its state writes in the integration metrics."""
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and count the write."""
+        async_get_metrics(self.hass).state_writes[self.entity_id] += 1
+        super().async_write_ha_state()
+
+
+class CachedCoordinatorEntity(MetricsEntity, CoordinatorEntity[CachedCoordinator]):
+    """Coordinator entity that stays available while serving cached data."""
+
+    @property
+    def available(self) -> bool:
+        """Return True while fresh or cached data is available."""
+        return super().available or self.coordinator.stale
+
+
+class LocationForecastEntity(CachedCoordinatorEntity):
+    """Entity reading one location from the shared parsed forecast."""
+
+    coordinator: ForecastCoordinator
+
+    def __init__(self, coordinator: ForecastCoordinator, location_id: str) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._location_id = location_id
+
+    @property
+    def _forecast(self) -> LocationForecast | None:
+        """Return the parsed forecast for this location."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get(self._location_id)
+
+    @property
+    def _current(self) -> DailyForecast | None:
+        """Return the forecast for today in Malaysia."""
+        if not (forecast := self._forecast):
+            return None
+        return forecast.current(
+            dt_util.now(dt_util.get_time_zone(TIMEZONE)).date()
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return if the location has fresh or cached forecast data."""
+        return super().available and self._current is not None
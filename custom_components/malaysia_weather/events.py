@@ -0,0 +1,52 @@
+"""Event deduplication for Malaysia Weather integration."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import CACHE_SAVE_DELAY, DOMAIN, EVENT_SEEN_MAX
+
+STORAGE_VERSION = 1
+
+
+class SeenEvents:
+    """Bounded set of fired event keys that survives restarts."""
+
+    def __init__(self, hass: HomeAssistant, storage_key: str) -> None:
+        """Initialize the set."""
+        self._store: Store[dict[str, list[str]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{storage_key}"
+        )
+        # A dict keeps insertion order, so the oldest keys are evicted first
+        self._seen: dict[str, None] = {}
+        self.seeded = False
+
+    async def async_load(self) -> None:
+        """Load the keys seen before the last restart."""
+        if stored := await self._store.async_load():
+            self._seen = dict.fromkeys(stored.get("seen", []))
+            self.seeded = True
+
+    def filter_new(self, keys: Iterable[str]) -> list[str]:
+        """Return the keys not seen before and remember them.
+
+        The first call after installation only records the keys, so events
+        already present at that point are not reported as new. It seeds the
+        set even when there are no keys, so an empty first refresh does not
+        swallow the first real event.
+        """
+        new = [key for key in dict.fromkeys(keys) if key not in self._seen]
+        if not new and self.seeded:
+            return []
+        self._seen.update(dict.fromkeys(new))
+        for key in list(self._seen)[: max(len(self._seen) - EVENT_SEEN_MAX, 0)]:
+            del self._seen[key]
+        self._store.async_delay_save(
+            lambda: {"seen": list(self._seen)}, CACHE_SAVE_DELAY
+        )
+        if not self.seeded:
+            self.seeded = True
+            return []
+        return new
@@ -1,17 +1,50 @@
 """Image platform for Malaysia Weather integration."""
 from __future__ import annotations
 import asyncio
+from collections.abc import Callable
+import base64
 from datetime import timedelta
 import logging
-import aiohttp
+import time
+
+from aiohttp import hdrs
 
 from homeassistant.components.image import ImageEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.util import dt as dt_util
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+)
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.event import async_track_time_interval
-from .const import DOMAIN, SATELLITE_URLS
+from .api import async_get_api
+from .entity import MetricsEntity
+from .imagecache import (
+    ImageTooLargeError,
+    async_get_image_cache,
+    image_store,
+    image_unique_id,
+)
+from .metrics import async_get_metrics
+from .scheduler import HostUnavailableError, phase_offset
+from .renditions import render_renditions
+from .timelapse import FrameHistory
+from .const import (
+    CACHE_SAVE_DELAY,
+    DOMAIN,
+    FRAME_HISTORIES,
+    IMAGE_CHUNK_SIZE,
+    IMAGE_IDLE_TTL,
+    IMAGE_MAX_BYTES,
+    IMAGE_RENDITIONS,
+    IMAGE_REQUEST_TIMEOUT,
+    SATELLITE_URLS,
+    SELECTED_IMAGERY,
+    SIGNAL_FRAMES_UPDATED,
+    SIGNAL_IMAGERY_SELECTED,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,75 +56,427 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Malaysia Weather image entities."""
-    if entry.data:
-        return
-
-    entities = []
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    cache = async_get_image_cache(hass)
+    entry_data[FRAME_HISTORIES] = {name: FrameHistory(cache) for name in SATELLITE_URLS}
+    entities: list[ImageEntity] = []
     for name, url in SATELLITE_URLS.items():
-        entities.append(WeatherImageEntity(hass, name, url))
+        image = WeatherImageEntity(hass, entry_data, name, url)
+        entities.append(image)
+        entities.extend(
+            WeatherImageRenditionEntity(hass, image, name, rendition)
+            for rendition in IMAGE_RENDITIONS
+        )
+    entities.append(WeatherTimeLapseEntity(hass, entry_data))
 
     async_add_entities(entities) 
 
-class WeatherImageEntity(ImageEntity):
-    """Representation of a Weather Image entity."""
+class WeatherImageEntity(MetricsEntity, ImageEntity):
+    """Representation of a Weather Image entity.
+
+    Only the product chosen in the Satellite Imagery select is polled. The
+    others are fetched when first viewed and then reused for IMAGE_IDLE_TTL.
+    Images are streamed into the shared disk cache and read back on view,
+    so the entity only holds the digest of its current image. Each new
+    image is also added to the product's frame history for the time-lapse,
+    and rendered into lighter renditions while rendition entities use them.
+    """
 
-    def __init__(self, hass: HomeAssistant, name: str, url: str) -> None:
+    def __init__(
+        self, hass: HomeAssistant, entry_data: dict, name: str, url: str
+    ) -> None:
         """Initialize the image entity."""
         super().__init__(hass)
         self._attr_has_entity_name = True
         self._attr_name = name
-        self._attr_unique_id = f"malaysia_weather_{name.lower().replace(' ', '_')}"
+        self._attr_unique_id = image_unique_id(name)
         self._attr_image_url = url
         self._attr_content_type = "image/gif" if url.endswith(".gif") else "image/jpeg"
-        self._cached_image: bytes | None = None
-        self._last_etag: str | None = None
+        self._image_digest: str | None = None
+        # Validators of the cached image, used for conditional requests
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        self._content_length: int | None = None
+        self._api = async_get_api(hass)
+        self._cache = async_get_image_cache(hass)
+        self._frames: FrameHistory = entry_data[FRAME_HISTORIES][name]
+        self._rendition_users = 0
+        self._entry_data = entry_data
+        self._product = name
+        self._hot = False
+        self._unsub_poll = None
+        self._last_fetch: float | None = None
+        self._fetch_lock = asyncio.Lock()
+        self._store = image_store(hass, self._attr_unique_id)
+        self._stale = False
+        # Only the selection received at startup may defer its fetch
+        self._initial_selection = True
 
     async def async_added_to_hass(self) -> None:
-        """Start polling when entity is added."""
+        """Follow the imagery selection when entity is added."""
         await super().async_added_to_hass()
-        await self._fetch_image()
-        # Schedule periodic polling
-        self._unsub = async_track_time_interval(
-            self.hass, self._handle_interval, SCAN_INTERVAL
+        # Shared cache files stay while this product's image or frames use them
+        self.async_on_remove(
+            self._cache.async_add_holder(
+                lambda: [self._image_digest, *self._frames.digests]
+            )
+        )
+        await self._async_restore()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_IMAGERY_SELECTED, self._async_imagery_selected
+            )
         )
+        if (selected := self._entry_data.get(SELECTED_IMAGERY)) is not None:
+            await self._async_imagery_selected(selected)
+
+    async def _async_restore(self) -> None:
+        """Load the digest and validators of the last downloaded image."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        try:
+            fetched_at = dt_util.parse_datetime(stored["fetched_at"])
+            if migrate := "image" in stored:
+                # Images used to be stored inline, move them to the disk cache
+                digest, size = await self._cache.async_store_bytes(
+                    base64.b64decode(stored["image"])
+                )
+            else:
+                digest, size = stored["digest"], stored["size"]
+        except (KeyError, TypeError, ValueError):
+            return
+        if not await self._cache.async_contains(digest):
+            return
+        self._image_digest = digest
+        self._etag = stored.get("etag")
+        self._last_modified = stored.get("last_modified")
+        self._content_length = size
+        self._attr_image_last_updated = fetched_at
+        self._stale = True
+        await self._frames.async_restore(stored.get("frames", []))
+        if not self._frames.digests:
+            await self._frames.async_add(digest, fetched_at)
+        if migrate:
+            self._store.async_delay_save(self._stored_image, CACHE_SAVE_DELAY)
+        async_dispatcher_send(self.hass, SIGNAL_FRAMES_UPDATED, self._product)
+
+    def _stored_image(self) -> dict:
+        """Return the digest and validators of the cached image for storage."""
+        return {
+            "fetched_at": self._attr_image_last_updated.isoformat(),
+            "etag": self._etag,
+            "last_modified": self._last_modified,
+            "digest": self._image_digest,
+            "size": self._content_length,
+            "frames": self._frames.as_list(),
+        }
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return whether the image is restored and not yet revalidated."""
+        return {"stale": self._stale}
+
+    def _async_confirm_fresh(self) -> None:
+        """Mark a restored image as fresh once upstream confirms it."""
+        if self._stale:
+            self._stale = False
+            self.async_write_ha_state()
 
     async def async_will_remove_from_hass(self) -> None:
         """Stop polling when entity is removed."""
-        if hasattr(self, "_unsub"):
-            self._unsub()
+        self._stop_polling()
+
+    def _stop_polling(self) -> None:
+        """Cancel the poll timer if running."""
+        if self._unsub_poll is not None:
+            self._unsub_poll()
+            self._unsub_poll = None
+
+    async def _async_imagery_selected(self, option: str) -> None:
+        """Keep this product hot only while it is selected."""
+        hot = option == self._product
+        initial, self._initial_selection = self._initial_selection, False
+        if hot == self._hot:
+            return
+        self._hot = hot
+        if not hot:
+            self._stop_polling()
+            return
+        # Prefetch the newly selected product, then poll it
+        self._unsub_poll = async_track_time_interval(
+            self.hass, self._handle_interval, SCAN_INTERVAL
+        )
+        if initial and self._image_digest is not None:
+            # Restored at startup, revalidate without joining the startup burst
+            self.hass.async_create_background_task(
+                self._async_revalidate(), f"{self._attr_name} revalidate"
+            )
+            return
+        async with self._fetch_lock:
+            await self._fetch_image()
+
+    async def _async_revalidate(self) -> None:
+        """Revalidate the restored image after a random delay."""
+        await asyncio.sleep(phase_offset())
+        if self._hot and self._last_fetch is None:
+            async with self._fetch_lock:
+                await self._fetch_image()
 
     async def _handle_interval(self, now) -> None:
         """Called on each poll interval."""
-        await self._fetch_image()
+        async with self._fetch_lock:
+            await self._fetch_image()
 
     async def _fetch_image(self) -> None:
         """Fetch the image and update state if it has changed."""
+        self._last_fetch = time.monotonic()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self._attr_image_url) as response:
-                    if response.status != 200:
-                        return
-
-                    new_etag = response.headers.get("ETag") or response.headers.get("Last-Modified")
-                    new_image = await response.read()
-
-                    changed = False
-                    if new_etag:
-                        if new_etag != self._last_etag:
-                            changed = True
-                            self._last_etag = new_etag
-                    elif new_image != self._cached_image:
-                        changed = True
-
-                    if changed or self._cached_image is None:
-                        self._cached_image = new_image
-                        self._attr_image_last_updated = dt_util.utcnow()
-                        self.async_write_ha_state()
-                        _LOGGER.debug("Image updated for %s", self._attr_name)
+            if (downloaded := await self._async_download()) is None:
+                return
+            digest, size = downloaded
+
+            # Servers may ignore validators, compare the digest of the content
+            self._content_length = size
+            if digest == self._image_digest:
+                self._async_confirm_fresh()
+                return
 
+            previous = self._image_digest
+            self._image_digest = digest
+            self._stale = False
+            self._attr_image_last_updated = dt_util.utcnow()
+            evicted = await self._frames.async_add(
+                digest,
+                self._attr_image_last_updated,
+                renditions=bool(self._rendition_users),
+            )
+            # Already cached unless the frame was held or failed to encode
+            if self._rendition_users:
+                await self.async_render_renditions(digest)
+            self._store.async_delay_save(self._stored_image, CACHE_SAVE_DELAY)
+            self.async_write_ha_state()
+            async_dispatcher_send(self.hass, SIGNAL_FRAMES_UPDATED, self._product)
+            _LOGGER.debug("Image updated for %s", self._attr_name)
+            # Images stay cached while any product uses them as image or frame
+            for unused in {previous, *evicted} - {None, digest}:
+                await self._cache.async_remove(unused)
+
+        except HostUnavailableError as err:
+            _LOGGER.debug("Skipped fetching image for %s: %s", self._attr_name, err)
         except Exception as err:
             _LOGGER.error("Error fetching image for %s: %s", self._attr_name, err)
 
+    async def _async_download(self) -> tuple[str, int] | None:
+        """Stream a changed image into the cache, return its digest and size."""
+        headers = {}
+        if self._image_digest is not None:
+            if self._etag:
+                headers[hdrs.IF_NONE_MATCH] = self._etag
+            if self._last_modified:
+                headers[hdrs.IF_MODIFIED_SINCE] = self._last_modified
+            # Without validators, probe the size before downloading
+            if not headers and await self._async_probe_unchanged():
+                _LOGGER.debug("Image size unchanged for %s", self._attr_name)
+                self._async_confirm_fresh()
+                return None
+
+        async with self._api.async_request(
+            "GET", self._attr_image_url, headers=headers, timeout=IMAGE_REQUEST_TIMEOUT
+        ) as response:
+            if response.status == 304:
+                _LOGGER.debug("Image not modified for %s", self._attr_name)
+                self._async_confirm_fresh()
+                return None
+            if response.status != 200:
+                return None
+            if (response.content_length or 0) > IMAGE_MAX_BYTES:
+                raise ImageTooLargeError(
+                    f"Image of {response.content_length} bytes exceeds {IMAGE_MAX_BYTES}"
+                )
+
+            downloaded = await self._cache.async_store(
+                response.content.iter_chunked(IMAGE_CHUNK_SIZE)
+            )
+            async_get_metrics(self.hass).endpoint(self._attr_image_url).bytes += (
+                downloaded[1]
+            )
+            self._etag = response.headers.get(hdrs.ETAG)
+            self._last_modified = response.headers.get(hdrs.LAST_MODIFIED)
+            return downloaded
+
+    async def _async_probe_unchanged(self) -> bool:
+        """Return True if a HEAD request reports the cached content length."""
+        async with self._api.async_request("HEAD", self._attr_image_url) as response:
+            if response.status != 200:
+                return False
+            return (
+                response.content_length is not None
+                and response.content_length == self._content_length
+            )
+
+    @callback
+    def async_use_renditions(self) -> Callable[[], None]:
+        """Render renditions of new images until the returned callback is called."""
+        self._rendition_users += 1
+
+        @callback
+        def _release() -> None:
+            self._rendition_users -= 1
+
+        return _release
+
+    async def async_render_renditions(self, digest: str) -> bool:
+        """Render the renditions of an image once, return False on failure."""
+        try:
+            await self._cache.async_render_many(
+                digest, IMAGE_RENDITIONS, render_renditions
+            )
+        except (OSError, ValueError) as err:
+            _LOGGER.warning(
+                "Unable to render renditions for %s: %s", self._attr_name, err
+            )
+            return False
+        return True
+
+    async def async_current_digest(self) -> str | None:
+        """Return the digest of the current image, fetching idle products on demand."""
+        if not self._hot:
+            async with self._fetch_lock:
+                if (
+                    self._last_fetch is None
+                    or time.monotonic() - self._last_fetch > IMAGE_IDLE_TTL
+                ):
+                    await self._fetch_image()
+        return self._image_digest
+
+    async def async_image(self) -> bytes | None:
+        """Return the cached image, fetching idle products on demand."""
+        if (digest := await self.async_current_digest()) is None:
+            return None
+        # Read on demand so the image is not held in memory between views
+        return await self._cache.async_read(digest)
+
+
+class WeatherImageRenditionEntity(MetricsEntity, ImageEntity):
+    """Lighter JPEG rendition of the latest frame of an imagery product.
+
+    Renditions are rendered once per new image and served from the disk
+    cache. The entities are disabled by default, and images are only
+    rendered while at least one of them is in use.
+    """
+
+    _attr_has_entity_name = True
+    _attr_content_type = "image/jpeg"
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        source: WeatherImageEntity,
+        name: str,
+        rendition: str,
+    ) -> None:
+        """Initialize the image entity."""
+        super().__init__(hass)
+        self._source = source
+        self._product = name
+        self._rendition = rendition
+        self._attr_name = f"{name} {rendition.title()}"
+        self._attr_unique_id = f"{source.unique_id}_{rendition}"
+        self._cache = async_get_image_cache(hass)
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the new images of the source product."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._source.async_use_renditions())
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_FRAMES_UPDATED, self._async_frames_updated
+            )
+        )
+        self._attr_image_last_updated = self._source.image_last_updated
+
+    @callback
+    def _async_frames_updated(self, product: str) -> None:
+        """Update when the source product has a new image."""
+        if product == self._product:
+            self._attr_image_last_updated = self._source.image_last_updated
+            self.async_write_ha_state()
+
+    async def async_image(self) -> bytes | None:
+        """Return the rendition of the current image."""
+        if (digest := await self._source.async_current_digest()) is None:
+            return None
+        # Images restored from before the rendition was in use render now
+        if not await self._source.async_render_renditions(digest):
+            return None
+        return await self._cache.async_read(digest, self._rendition)
+
+
+class WeatherTimeLapseEntity(MetricsEntity, ImageEntity):
+    """Time-lapse of the recent frames of the selected imagery product."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Imagery Time-lapse"
+    _attr_content_type = "image/gif"
+
+    def __init__(self, hass: HomeAssistant, entry_data: dict) -> None:
+        """Initialize the image entity."""
+        super().__init__(hass)
+        self._attr_unique_id = "malaysia_weather_imagery_time_lapse"
+        self._entry_data = entry_data
+        self._histories: dict[str, FrameHistory] = entry_data[FRAME_HISTORIES]
+
+    @property
+    def _history(self) -> FrameHistory | None:
+        """Return the frame history of the selected product."""
+        return self._histories.get(self._entry_data.get(SELECTED_IMAGERY))
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the imagery selection and its new frames."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_IMAGERY_SELECTED, self._async_imagery_selected
+            )
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_FRAMES_UPDATED, self._async_frames_updated
+            )
+        )
+        self._async_update_from_history()
+
+    @callback
+    def _async_imagery_selected(self, option: str) -> None:
+        """Show the time-lapse of the newly selected product."""
+        self._async_update_from_history()
+        self.async_write_ha_state()
+
+    @callback
+    def _async_frames_updated(self, product: str) -> None:
+        """Update when the selected product gets a new frame."""
+        if product == self._entry_data.get(SELECTED_IMAGERY):
+            self._async_update_from_history()
+            self.async_write_ha_state()
+
+    @callback
+    def _async_update_from_history(self) -> None:
+        """Take the update time from the newest frame."""
+        if (history := self._history) is not None:
+            self._attr_image_last_updated = history.updated
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the product and number of frames in the time-lapse."""
+        history = self._history
+        return {
+            "product": self._entry_data.get(SELECTED_IMAGERY),
+            "frames": len(history.digests) if history else 0,
+        }
+
     async def async_image(self) -> bytes | None:
-        """Return the cached image bytes."""
-        return self._cached_image
+        """Return the time-lapse, stitched from the encoded frames."""
+        if (history := self._history) is None:
+            return None
+        return await history.async_timelapse()
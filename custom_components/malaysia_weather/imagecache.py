@@ -0,0 +1,252 @@
+"""Content-addressed image cache for Malaysia Weather integration."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Callable, Iterable
+from functools import partial
+import hashlib
+import logging
+import os
+from pathlib import Path
+import shutil
+import tempfile
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    IMAGE_CACHE,
+    IMAGE_MAX_BYTES,
+    IMAGE_WRITE_BUFFER,
+    SATELLITE_URLS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+STORAGE_VERSION = 1
+
+
+class ImageTooLargeError(Exception):
+    """An image exceeded IMAGE_MAX_BYTES."""
+
+
+class ImageCache:
+    """Images stored on disk under .storage, named by their digest.
+
+    Downloads are streamed into a temporary file while they are hashed, then
+    moved into place, so an image is never held in memory as a whole and
+    identical content is stored once. Entities keep only the digest.
+
+    Variants derived from an image, such as time-lapse frames, are stored
+    next to it as "<digest>.<variant>" and removed along with it.
+
+    Identical content fetched for different products shares one file, so
+    holders register the digests they use and an image is only removed
+    once none of them references it.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._hass = hass
+        self._directory = Path(hass.config.path(".storage", f"{DOMAIN}_images"))
+        self._holders: list[Callable[[], Iterable[str | None]]] = []
+
+    @callback
+    def async_add_holder(
+        self, references: Callable[[], Iterable[str | None]]
+    ) -> Callable[[], None]:
+        """Register a source of digests in use, return a callback to remove it."""
+        self._holders.append(references)
+
+        @callback
+        def _remove_holder() -> None:
+            self._holders.remove(references)
+
+        return _remove_holder
+
+    def _referenced(self, digest: str) -> bool:
+        """Return True if any holder still uses an image."""
+        return any(digest in references() for references in self._holders)
+
+    def _path(self, digest: str, variant: str | None = None) -> Path:
+        """Return the file holding an image or one of its variants."""
+        return self._directory / (f"{digest}.{variant}" if variant else digest)
+
+    async def async_contains(self, digest: str, variant: str | None = None) -> bool:
+        """Return True if an image or variant is cached."""
+        return await self._hass.async_add_executor_job(
+            self._path(digest, variant).is_file
+        )
+
+    async def async_store(self, chunks: AsyncIterator[bytes]) -> tuple[str, int]:
+        """Stream an image into the cache, return its digest and size.
+
+        Chunks are buffered up to IMAGE_WRITE_BUFFER and written in one
+        executor job, so a typical image is written and committed at once.
+        """
+        file = None
+        buffer: list[bytes] = []
+        buffered = 0
+        digest = hashlib.blake2b(digest_size=16)
+        size = 0
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > IMAGE_MAX_BYTES:
+                    raise ImageTooLargeError(f"Image exceeds {IMAGE_MAX_BYTES} bytes")
+                digest.update(chunk)
+                buffer.append(chunk)
+                buffered += len(chunk)
+                if buffered >= IMAGE_WRITE_BUFFER:
+                    file = await self._hass.async_add_executor_job(
+                        self._write, file, buffer
+                    )
+                    buffer = []
+                    buffered = 0
+        except BaseException:
+            if file is not None:
+                await self._hass.async_add_executor_job(self._discard, file)
+            raise
+        await self._hass.async_add_executor_job(
+            self._commit, file, buffer, self._path(digest.hexdigest())
+        )
+        return digest.hexdigest(), size
+
+    def _write(self, file, chunks: list[bytes]):
+        """Write chunks to the temporary file, opening it first if needed."""
+        if file is None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            file = tempfile.NamedTemporaryFile(
+                dir=self._directory, suffix=".part", delete=False
+            )
+        file.writelines(chunks)
+        return file
+
+    @staticmethod
+    def _discard(file) -> None:
+        """Close and delete a temporary file."""
+        file.close()
+        os.unlink(file.name)
+
+    def _commit(self, file, chunks: list[bytes], path: Path) -> None:
+        """Move a complete download into place, unless already cached."""
+        if path.is_file():
+            if file is not None:
+                self._discard(file)
+            return
+        file = self._write(file, chunks)
+        file.close()
+        os.replace(file.name, path)
+
+    async def async_store_bytes(self, image: bytes) -> tuple[str, int]:
+        """Store an image already in memory, return its digest and size."""
+
+        async def _chunks() -> AsyncIterator[bytes]:
+            yield image
+
+        return await self.async_store(_chunks())
+
+    async def async_read(self, digest: str, variant: str | None = None) -> bytes | None:
+        """Read an image or variant, or return None if it is not cached."""
+        return await self._hass.async_add_executor_job(self._read, digest, variant)
+
+    async def async_read_all(
+        self, digests: Iterable[str], variant: str | None = None
+    ) -> list[bytes]:
+        """Read the cached images or variants of several digests at once."""
+
+        def _read_all() -> list[bytes]:
+            return [
+                data
+                for digest in digests
+                if (data := self._read(digest, variant)) is not None
+            ]
+
+        return await self._hass.async_add_executor_job(_read_all)
+
+    def _read(self, digest: str, variant: str | None = None) -> bytes | None:
+        """Read an image or variant from disk."""
+        try:
+            return self._path(digest, variant).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    async def async_render(
+        self, digest: str, variant: str, render: Callable[[bytes], bytes]
+    ) -> None:
+        """Derive a variant from a cached image in the executor, once."""
+        await self.async_render_many(
+            digest, (variant,), lambda image: {variant: render(image)}
+        )
+
+    async def async_render_many(
+        self,
+        digest: str,
+        variants: Iterable[str],
+        render: Callable[[bytes], dict[str, bytes]],
+    ) -> None:
+        """Derive several variants from one decode of a cached image, once."""
+        await self._hass.async_add_executor_job(
+            self._render, digest, tuple(variants), render
+        )
+
+    def _render(
+        self,
+        digest: str,
+        variants: tuple[str, ...],
+        render: Callable[[bytes], dict[str, bytes]],
+    ) -> None:
+        """Write the variants unless they already exist."""
+        if all(self._path(digest, variant).is_file() for variant in variants):
+            return
+        if (image := self._read(digest)) is None:
+            raise FileNotFoundError(self._path(digest))
+        for variant, data in render(image).items():
+            path = self._path(digest, variant)
+            temporary = path.with_suffix(f".{variant}.part")
+            temporary.write_bytes(data)
+            os.replace(temporary, path)
+
+    async def async_remove(self, digest: str) -> None:
+        """Delete an image and its variants unless a holder references it."""
+        if self._referenced(digest):
+            return
+        await self._hass.async_add_executor_job(self._remove, digest)
+
+    async def async_clear(self) -> None:
+        """Delete the whole cache directory."""
+        await self._hass.async_add_executor_job(
+            partial(shutil.rmtree, self._directory, ignore_errors=True)
+        )
+
+    def _remove(self, digest: str) -> None:
+        """Delete an image and its variants from disk."""
+        for path in (self._path(digest), *self._directory.glob(f"{digest}.*")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+@callback
+def async_get_image_cache(hass: HomeAssistant) -> ImageCache:
+    """Return the shared image cache, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (cache := domain_data.get(IMAGE_CACHE)) is None:
+        cache = domain_data[IMAGE_CACHE] = ImageCache(hass)
+    return cache
+
+
+def image_unique_id(name: str) -> str:
+    """Return the unique ID of a product's image entity."""
+    return f"malaysia_weather_{name.lower().replace(' ', '_')}"
+
+
+def image_store(hass: HomeAssistant, unique_id: str) -> Store[dict]:
+    """Return the store holding the cached image state of a product."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.image_{unique_id}")
+
+
+async def async_remove_image_stores(hass: HomeAssistant) -> None:
+    """Delete the cached image state of every product."""
+    for name in SATELLITE_URLS:
+        await image_store(hass, image_unique_id(name)).async_remove()
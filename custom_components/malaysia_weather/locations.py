@@ -0,0 +1,157 @@
+"""Location catalogue for Malaysia Weather integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import async_get_api
+from .query import LOCATION_COLUMNS, ApiQuery, malaysia_today
+from .const import (
+    DOMAIN,
+    FORECAST_REQUEST_TIMEOUT,
+    FORECAST_URL,
+    LOCATION_CATALOGUE,
+    LOCATION_CATALOGUE_TTL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+STORAGE_KEY = f"{DOMAIN}.locations"
+STORAGE_VERSION = 1
+
+
+def location_display_name(location_name: str) -> str:
+    """Strip the location type suffix, e.g. "Langkawi (Ds)"."""
+    return location_name.split(" (")[0]
+
+
+def normalize_location_name(location_name: str) -> str:
+    """Return a case and whitespace insensitive key for a location name."""
+    return " ".join(location_display_name(location_name).casefold().split())
+
+
+class LocationCatalogue:
+    """Cached, indexed list of the locations that have a forecast.
+
+    The list is fetched with only the location columns of a single day,
+    persisted with a TTL, and indexed by ID and by normalized name so the
+    config and options flows can validate a choice without a request.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the catalogue."""
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._lock = asyncio.Lock()
+        self._fetched_at: datetime | None = None
+        self._by_id: dict[str, str] = {}
+        self._by_name: dict[str, str] = {}
+        self._options: dict[str, str] = {}
+        # Incremented whenever the indexes are replaced
+        self.version = 0
+
+    @property
+    def locations(self) -> dict[str, str]:
+        """Return the display name of every location, keyed by ID."""
+        return self._by_id
+
+    @property
+    def options(self) -> dict[str, str]:
+        """Return location names keyed by ID, deduplicated and sorted by name."""
+        return self._options
+
+    def get_name(self, location_id: str) -> str | None:
+        """Return the display name of a location ID."""
+        return self._by_id.get(location_id)
+
+    def find(self, location_name: str) -> str | None:
+        """Return the location ID for a name."""
+        return self._by_name.get(normalize_location_name(location_name))
+
+    def _expired(self) -> bool:
+        """Return True if the catalogue needs to be fetched again."""
+        return (
+            self._fetched_at is None
+            or dt_util.utcnow() - self._fetched_at
+            > timedelta(seconds=LOCATION_CATALOGUE_TTL)
+        )
+
+    async def async_load(self) -> None:
+        """Load the catalogue from storage, refetching it once expired."""
+        async with self._lock:
+            if self._fetched_at is None and (
+                stored := await self._store.async_load()
+            ):
+                self._index(stored["locations"])
+                self._fetched_at = dt_util.parse_datetime(stored["fetched_at"])
+            if not self._expired():
+                return
+            try:
+                locations = await self._async_fetch()
+            except Exception:  # pylint: disable=broad-except
+                if not self._by_id:
+                    raise
+                _LOGGER.warning("Error refreshing locations, using cached list")
+                return
+            self._fetched_at = dt_util.utcnow()
+            self._index(locations)
+            await self._store.async_save(
+                {"fetched_at": self._fetched_at.isoformat(), "locations": locations}
+            )
+
+    async def _async_fetch(self) -> dict[str, str]:
+        """Fetch location IDs and names for a single forecast day."""
+        api = async_get_api(self._hass)
+        today = malaysia_today()
+        query = ApiQuery(LOCATION_COLUMNS).dates("date", start=today, end=today)
+        data = await api.async_get_json(
+            FORECAST_URL, params=query.params, timeout=FORECAST_REQUEST_TIMEOUT
+        )
+        if not data:
+            # Today's forecast is not published yet, take every day instead
+            data = await api.async_get_json(
+                FORECAST_URL,
+                params=ApiQuery(LOCATION_COLUMNS).params,
+                timeout=FORECAST_REQUEST_TIMEOUT,
+            )
+
+        locations: dict[str, str] = {}
+        for item in data:
+            try:
+                location = item["location"]
+                locations.setdefault(location["location_id"], location["location_name"])
+            except (KeyError, TypeError):
+                continue
+        return locations
+
+    def _index(self, locations: dict[str, str]) -> None:
+        """Rebuild the lookup indexes."""
+        by_id: dict[str, str] = {}
+        by_name: dict[str, str] = {}
+        for location_id, location_name in locations.items():
+            by_id[location_id] = location_display_name(location_name)
+            by_name.setdefault(normalize_location_name(location_name), location_id)
+        self._by_id = by_id
+        self._by_name = by_name
+        self.version += 1
+        # Several IDs can share a name, only offer the first one
+        self._options = dict(
+            sorted(
+                ((location_id, by_id[location_id]) for location_id in by_name.values()),
+                key=lambda item: item[1],
+            )
+        )
+
+
+@callback
+def async_get_location_catalogue(hass: HomeAssistant) -> LocationCatalogue:
+    """Return the shared location catalogue, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (catalogue := domain_data.get(LOCATION_CATALOGUE)) is None:
+        catalogue = domain_data[LOCATION_CATALOGUE] = LocationCatalogue(hass)
+    return catalogue
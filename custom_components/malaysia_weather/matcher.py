@@ -0,0 +1,73 @@
+"""Warning text to location matching for Malaysia Weather integration."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+import re
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize_text(text: str) -> str:
+    """Return text casefolded, with words separated by single spaces."""
+    return " ".join(_SEPARATORS.sub(" ", text.casefold()).split())
+
+
+class LocationMatcher:
+    """Aho-Corasick automaton over location names.
+
+    All names are compiled into one automaton, so a warning text is scanned
+    once regardless of how many locations are configured. Names only match
+    whole words.
+    """
+
+    __slots__ = ("_goto", "_fail", "_output")
+
+    def __init__(self, names: Iterable[tuple[str, str]]) -> None:
+        """Compile (location ID, location name) pairs."""
+        goto: list[dict[str, int]] = [{}]
+        output: list[frozenset[str] | set[str]] = [set()]
+        for location_id, name in names:
+            if not (pattern := normalize_text(name)):
+                continue
+            node = 0
+            # Surrounding spaces anchor the match to word boundaries
+            for char in f" {pattern} ":
+                if (child := goto[node].get(char)) is None:
+                    child = goto[node][char] = len(goto)
+                    goto.append({})
+                    output.append(set())
+                node = child
+            output[node].add(location_id)
+
+        # Breadth-first pass to link each node to its longest proper suffix
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                output[child] |= output[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = [frozenset(ids) for ids in output]
+
+    def match(self, text: str) -> set[str]:
+        """Return the IDs of every location named in a text."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found: set[str] = set()
+        node = 0
+        for char in f" {normalize_text(text)} ":
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found |= output[node]
+        return found
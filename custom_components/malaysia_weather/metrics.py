@@ -0,0 +1,166 @@
+"""Request and refresh metrics for Malaysia Weather integration."""
+from __future__ import annotations
+
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    EARTHQUAKE_URL,
+    FORECAST_URL,
+    METRICS,
+    METRICS_LATENCY_SAMPLES,
+    SATELLITE_URLS,
+    WARNING_URL,
+)
+
+# Endpoint names match the coordinators' storage keys and imagery products
+ENDPOINT_NAMES: dict[str, str] = {
+    FORECAST_URL: "forecast",
+    WARNING_URL: "warnings",
+    EARTHQUAKE_URL: "earthquake",
+    **{url: product for product, url in SATELLITE_URLS.items()},
+}
+
+
+def _ratio(part: int, whole: int) -> float | None:
+    """Return a rounded ratio, or None without samples."""
+    return round(part / whole, 3) if whole else None
+
+
+class EndpointMetrics:
+    """Counters for the requests to, and parsing of, one endpoint."""
+
+    __slots__ = (
+        "requests",
+        "errors",
+        "not_modified",
+        "cache_hits",
+        "coalesced",
+        "bytes",
+        "parses",
+        "parse_time",
+        "last_parse_time",
+        "last_decode_time",
+        "last_success",
+        "_latencies",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.errors = 0
+        self.not_modified = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.bytes = 0
+        self.parses = 0
+        self.parse_time = 0.0
+        self.last_parse_time: float | None = None
+        self.last_decode_time: float | None = None
+        self.last_success: datetime | None = None
+        self._latencies: deque[float] = deque(maxlen=METRICS_LATENCY_SAMPLES)
+
+    def record_response(self, status: int, latency: float) -> None:
+        """Count a response and the time it took to arrive."""
+        self.requests += 1
+        self._latencies.append(latency)
+        if status == 304:
+            self.not_modified += 1
+        if status < 400:
+            self.last_success = dt_util.utcnow()
+        else:
+            self.errors += 1
+
+    def record_error(self) -> None:
+        """Count a request that failed without a response."""
+        self.requests += 1
+        self.errors += 1
+
+    def record_parse(self, seconds: float) -> None:
+        """Count the time spent decoding and parsing a payload."""
+        self.parses += 1
+        self.parse_time += seconds
+        self.last_parse_time = seconds
+
+    def latency(self, percentile: float) -> float | None:
+        """Return a latency percentile of the recent requests, in seconds."""
+        if not self._latencies:
+            return None
+        samples = sorted(self._latencies)
+        return samples[min(int(len(samples) * percentile), len(samples) - 1)]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as attributes."""
+        p50, p95 = self.latency(0.5), self.latency(0.95)
+        served = self.requests + self.cache_hits + self.coalesced
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "latency_p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "not_modified_ratio": _ratio(self.not_modified, self.requests),
+            "cache_hit_ratio": _ratio(self.cache_hits + self.coalesced, served),
+            "decode_time_last_ms": round(self.last_decode_time * 1000, 1)
+            if self.last_decode_time is not None
+            else None,
+            "parse_time_last_ms": round(self.last_parse_time * 1000, 1)
+            if self.last_parse_time is not None
+            else None,
+            "parse_time_avg_ms": round(self.parse_time / self.parses * 1000, 1)
+            if self.parses
+            else None,
+            "last_success": self.last_success.isoformat()
+            if self.last_success
+            else None,
+            "last_success_age": round(
+                (dt_util.utcnow() - self.last_success).total_seconds()
+            )
+            if self.last_success
+            else None,
+        }
+
+
+class Metrics:
+    """Integration-wide metrics, kept in memory only."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.endpoints: dict[str, EndpointMetrics] = {
+            name: EndpointMetrics() for name in ENDPOINT_NAMES.values()
+        }
+        self.state_writes: Counter[str] = Counter()
+
+    def endpoint(self, url: str) -> EndpointMetrics:
+        """Return the metrics of the endpoint a URL belongs to."""
+        url = url.split("?", 1)[0]
+        return self.named(ENDPOINT_NAMES.get(url, url))
+
+    def named(self, name: str) -> EndpointMetrics:
+        """Return the metrics of an endpoint by name."""
+        if (metrics := self.endpoints.get(name)) is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return every metric."""
+        return {
+            "endpoints": {
+                name: metrics.as_dict() for name, metrics in self.endpoints.items()
+            },
+            "state_writes": dict(self.state_writes),
+        }
+
+
+@callback
+def async_get_metrics(hass: HomeAssistant) -> Metrics:
+    """Return the shared metrics, creating them on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (metrics := domain_data.get(METRICS)) is None:
+        metrics = domain_data[METRICS] = Metrics()
+    return metrics
@@ -0,0 +1,519 @@
+"""Parsed data models for Malaysia Weather integration."""
+from __future__ import annotations
+
+from array import array
+from datetime import date, datetime, time
+from functools import lru_cache
+import logging
+import sys
+from typing import Any
+
+from homeassistant.util import dt as dt_util, location as location_util
+
+from .conditions import CONDITION_CLASSIFIER
+from .const import TIMEZONE
+
+_LOGGER = logging.getLogger(__name__)
+
+# Parts of the day forecast by MET, with the local hour each one starts
+FORECAST_PERIODS: dict[str, int] = {"morning": 6, "afternoon": 12, "night": 18}
+
+
+def parse_local_datetime(value: Any) -> datetime | None:
+    """Parse an API timestamp, assuming Malaysia time when it has no offset."""
+    if not isinstance(value, str):
+        return None
+    if (parsed := dt_util.parse_datetime(value)) is None:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_util.get_time_zone(TIMEZONE))
+    return parsed
+
+
+# Every location repeats the same few dates, share one object for each
+_parse_date = lru_cache(maxsize=32)(date.fromisoformat)
+
+
+def _intern(value: Any) -> str | None:
+    """Intern a repeated API string, so all records share one copy."""
+    return sys.intern(value) if isinstance(value, str) else None
+
+
+class DailyForecast:
+    """Forecast for one location and day.
+
+    Records are reduced to a few slots holding a shared date, floats and
+    interned phrases, so thousands of parsed days stay small.
+    """
+
+    __slots__ = ("date", "max_temp", "min_temp", "summary", "condition", "periods")
+
+    def __init__(
+        self,
+        day: date,
+        max_temp: float,
+        min_temp: float,
+        summary: str,
+        periods: tuple[str | None, ...] = (),
+    ) -> None:
+        """Initialize the forecast."""
+        self.date = day
+        self.max_temp = max_temp
+        self.min_temp = min_temp
+        self.summary = summary
+        self.condition = CONDITION_CLASSIFIER.classify(summary)
+        # Summary of each part of the day, in FORECAST_PERIODS order
+        self.periods = periods
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if both forecasts hold the same values."""
+        if not isinstance(other, DailyForecast):
+            return NotImplemented
+        return (
+            self.date == other.date
+            and self.max_temp == other.max_temp
+            and self.min_temp == other.min_temp
+            and self.summary == other.summary
+            and self.periods == other.periods
+        )
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> DailyForecast:
+        """Parse a record of the forecast dataset."""
+        return cls(
+            _parse_date(record["date"]),
+            float(record["max_temp"]),
+            float(record["min_temp"]),
+            sys.intern(record["summary_forecast"]),
+            tuple(
+                _intern(record.get(f"{period}_forecast"))
+                for period in FORECAST_PERIODS
+            ),
+        )
+
+    def as_record(self, location_id: str) -> dict[str, Any]:
+        """Return the forecast in the shape of the forecast dataset."""
+        return {
+            "location": {"location_id": location_id},
+            "date": self.date.isoformat(),
+            "max_temp": self.max_temp,
+            "min_temp": self.min_temp,
+            "summary_forecast": self.summary,
+            **{
+                f"{period}_forecast": phrase
+                for period, phrase in zip(FORECAST_PERIODS, self.periods)
+            },
+        }
+
+    def period_summary(self, period: str) -> str | None:
+        """Return the forecast phrase of a part of the day."""
+        for name, phrase in zip(FORECAST_PERIODS, self.periods):
+            if name == period:
+                return phrase
+        return None
+
+    def period_condition(self, period: str) -> str:
+        """Return the condition of a part of the day, or of the whole day."""
+        if (phrase := self.period_summary(period)) is None:
+            return self.condition
+        condition = CONDITION_CLASSIFIER.classify(phrase)
+        if period == "night" and condition == "sunny":
+            return "clear-night"
+        return condition
+
+
+class LocationForecast:
+    """Forecast days of one location, sorted by date."""
+
+    __slots__ = (
+        "location_id",
+        "days",
+        "_by_date",
+        "_forecast_daily",
+        "_forecast_twice_daily",
+    )
+
+    def __init__(self, location_id: str, days: list[DailyForecast]) -> None:
+        """Initialize the forecast."""
+        self.location_id = location_id
+        self.days = sorted(days, key=lambda day: day.date)
+        self._by_date = {day.date: day for day in self.days}
+        self._forecast_daily: list[dict[str, Any]] | None = None
+        self._forecast_twice_daily: list[dict[str, Any]] | None = None
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if both forecasts hold the same days."""
+        if not isinstance(other, LocationForecast):
+            return NotImplemented
+        return self.location_id == other.location_id and self.days == other.days
+
+    def as_records(self) -> list[dict[str, Any]]:
+        """Return the forecast days in the shape of the forecast dataset."""
+        return [day.as_record(self.location_id) for day in self.days]
+
+    def current(self, today: date) -> DailyForecast | None:
+        """Return the forecast for today, or the closest day available."""
+        if (day := self._by_date.get(today)) is not None:
+            return day
+        for day in self.days:
+            if day.date > today:
+                return day
+        return self.days[-1] if self.days else None
+
+    def forecast_daily(self) -> list[dict[str, Any]]:
+        """Return the daily forecast, built once per parsed payload."""
+        if self._forecast_daily is None:
+            self._forecast_daily = [
+                {
+                    "datetime": datetime.combine(day.date, time()).isoformat(),
+                    "native_temperature": day.max_temp,
+                    "native_templow": day.min_temp,
+                    "condition": day.condition,
+                }
+                for day in self.days
+            ]
+        return self._forecast_daily
+
+    def forecast_twice_daily(self) -> list[dict[str, Any]]:
+        """Return the day and night forecast, built once per parsed payload.
+
+        Afternoon storms are the most common weather event of the day, so
+        the daytime condition follows the afternoon forecast.
+        """
+        if self._forecast_twice_daily is None:
+            timezone = dt_util.get_time_zone(TIMEZONE)
+            forecast: list[dict[str, Any]] = []
+            for day in self.days:
+                for period, starts, is_daytime in (
+                    ("afternoon", "morning", True),
+                    ("night", "night", False),
+                ):
+                    start = time(FORECAST_PERIODS[starts], tzinfo=timezone)
+                    forecast.append(
+                        {
+                            "datetime": datetime.combine(day.date, start).isoformat(),
+                            "is_daytime": is_daytime,
+                            "native_temperature": (
+                                day.max_temp if is_daytime else day.min_temp
+                            ),
+                            "native_templow": day.min_temp,
+                            "condition": day.period_condition(period),
+                        }
+                    )
+            self._forecast_twice_daily = forecast
+        return self._forecast_twice_daily
+
+
+def parse_forecasts(data: list[dict[str, Any]]) -> dict[str, LocationForecast]:
+    """Parse the forecast dataset into forecasts keyed by location ID."""
+    days: dict[str, list[DailyForecast]] = {}
+    for record in data:
+        try:
+            location_id = sys.intern(record["location"]["location_id"])
+            day = DailyForecast.from_record(record)
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.error("Error parsing forecast data: %s", err)
+            continue
+        days.setdefault(location_id, []).append(day)
+    return {
+        location_id: LocationForecast(location_id, location_days)
+        for location_id, location_days in days.items()
+    }
+
+
+class WeatherWarning:
+    """A weather warning issued by MET Malaysia."""
+
+    __slots__ = (
+        "key",
+        "heading",
+        "text",
+        "instruction",
+        "valid_from",
+        "valid_to",
+        "areas",
+    )
+
+    def __init__(self, record: dict[str, Any]) -> None:
+        """Initialize the warning from a record of the warning dataset."""
+        issue = record.get("warning_issue")
+        issued = issue.get("issued") if isinstance(issue, dict) else None
+        self.heading: str | None = record.get("heading_en")
+        self.text: str | None = record.get("text_en")
+        self.instruction: str | None = record.get("instruction_en")
+        self.valid_from = parse_local_datetime(record.get("valid_from"))
+        self.valid_to = parse_local_datetime(record.get("valid_to"))
+        # The same warning is reported on every poll until it expires
+        self.key = (issued, self.heading, record.get("valid_from"))
+        # Names of the known locations mentioned in the warning
+        self.areas: list[str] = []
+
+    def as_record(self) -> dict[str, Any]:
+        """Return the warning in the shape of the warning dataset."""
+        issued, _, valid_from = self.key
+        return {
+            "warning_issue": {"issued": issued},
+            "valid_from": valid_from,
+            "valid_to": self.valid_to.isoformat() if self.valid_to else None,
+            "heading_en": self.heading,
+            "text_en": self.text,
+            "instruction_en": self.instruction,
+        }
+
+    def is_active(self, now: datetime) -> bool:
+        """Return True if the warning is in force at the given time."""
+        return (self.valid_from is None or self.valid_from <= now) and (
+            self.valid_to is None or now < self.valid_to
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the warning as state attributes."""
+        return {
+            "heading": self.heading,
+            "valid_from": self.valid_from.isoformat() if self.valid_from else None,
+            "valid_to": self.valid_to.isoformat() if self.valid_to else None,
+            "text": self.text,
+            "instruction": self.instruction,
+            "areas": self.areas,
+        }
+
+
+class WarningSet:
+    """Warnings indexed by identity, with the ones in force at parse time."""
+
+    __slots__ = ("warnings", "active")
+
+    def __init__(self, warnings: list[WeatherWarning], now: datetime) -> None:
+        """Initialize the set."""
+        self.warnings = {warning.key: warning for warning in warnings}
+        self.active = sorted(
+            (warning for warning in self.warnings.values() if warning.is_active(now)),
+            key=lambda warning: warning.valid_from.timestamp()
+            if warning.valid_from
+            else 0,
+        )
+
+    def as_records(self) -> list[dict[str, Any]]:
+        """Return the warnings in the shape of the warning dataset."""
+        return [warning.as_record() for warning in self.warnings.values()]
+
+    @property
+    def boundaries(self) -> list[datetime]:
+        """Return the validity bounds of every warning."""
+        return [
+            boundary
+            for warning in self.warnings.values()
+            for boundary in (warning.valid_from, warning.valid_to)
+            if boundary is not None
+        ]
+
+    def diff(
+        self, previous: WarningSet | None
+    ) -> tuple[list[WeatherWarning], list[WeatherWarning]]:
+        """Return the warnings that came into force and that expired."""
+        before = {warning.key: warning for warning in previous.active} if previous else {}
+        after = {warning.key: warning for warning in self.active}
+        issued = [warning for key, warning in after.items() if key not in before]
+        expired = [warning for key, warning in before.items() if key not in after]
+        return issued, expired
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if both sets hold the same warnings and active warnings.
+
+        Warnings are compared by content, not only by key, since MET can
+        extend valid_to or correct the text of a warning under the same key.
+        """
+        if not isinstance(other, WarningSet):
+            return NotImplemented
+        return self._contents() == other._contents() and [
+            warning.key for warning in self.active
+        ] == [warning.key for warning in other.active]
+
+    def _contents(self) -> dict[tuple, dict[str, Any]]:
+        """Return the attributes of every warning, keyed by identity."""
+        return {key: warning.as_dict() for key, warning in self.warnings.items()}
+
+
+def parse_warnings(data: list[dict[str, Any]], now: datetime) -> WarningSet:
+    """Parse the warning dataset."""
+    return WarningSet(
+        [WeatherWarning(record) for record in data or [] if isinstance(record, dict)],
+        now,
+    )
+
+
+class Earthquake:
+    """An earthquake reported by MET Malaysia."""
+
+    __slots__ = (
+        "key",
+        "occurred",
+        "latitude",
+        "longitude",
+        "magnitude",
+        "depth",
+        "location",
+        "distance",
+        "status",
+    )
+
+    def __init__(self, record: dict[str, Any], occurred: datetime) -> None:
+        """Initialize the earthquake from a record of the earthquake dataset."""
+        self.occurred = occurred
+        self.latitude = _to_float(record.get("lat"))
+        self.longitude = _to_float(record.get("lon"))
+        self.magnitude = _to_float(record.get("magdefault"))
+        self.depth = _to_float(record.get("depth"))
+        self.location: str | None = record.get("location_original")
+        self.distance: str | None = record.get("n_distancemas")
+        self.status: str | None = record.get("status")
+        self.key = "|".join(
+            map(str, (occurred.isoformat(), self.latitude, self.longitude, self.magnitude))
+        )
+
+    def as_record(self) -> dict[str, Any]:
+        """Return the earthquake in the shape of the earthquake dataset."""
+        return {
+            "localdatetime": self.occurred.isoformat(),
+            "lat": self.latitude,
+            "lon": self.longitude,
+            "magdefault": self.magnitude,
+            "depth": self.depth,
+            "location_original": self.location,
+            "n_distancemas": self.distance,
+            "status": self.status,
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the earthquake as state or event attributes."""
+        return {
+            "magnitude": self.magnitude,
+            "depth": self.depth,
+            "location": self.location,
+            "distance_from_malaysia": self.distance,
+            "datetime": self.occurred.isoformat(),
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+        }
+
+
+def _to_float(value: Any) -> float | None:
+    """Convert an API number, which may be a string, to a float."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class EarthquakeHistory:
+    """Fixed-size ring buffer of recent earthquakes.
+
+    Occurrence times and magnitudes are kept in flat arrays next to the
+    earthquakes, so time and magnitude queries scan compact memory, and the
+    oldest slot is overwritten once the buffer is full.
+    """
+
+    __slots__ = ("_quakes", "_times", "_magnitudes", "_next", "_keys")
+
+    def __init__(self, size: int) -> None:
+        """Initialize an empty buffer."""
+        self._quakes: list[Earthquake | None] = [None] * size
+        self._times = array("d", [0.0]) * size
+        self._magnitudes = array("d", [0.0]) * size
+        self._next = 0
+        self._keys: set[str] = set()
+
+    def __len__(self) -> int:
+        """Return the number of earthquakes held."""
+        return len(self._keys)
+
+    def ingest(self, records: list[dict[str, Any]]) -> list[Earthquake]:
+        """Add earthquakes not held yet, return them oldest first."""
+        # Once full, never evict a held quake for an even older one
+        oldest = (
+            min(self._times)
+            if len(self._keys) == len(self._quakes)
+            else float("-inf")
+        )
+        added: dict[str, Earthquake] = {}
+        for record in records or []:
+            if not isinstance(record, dict):
+                continue
+            if (occurred := parse_local_datetime(record.get("localdatetime"))) is None:
+                continue
+            quake = Earthquake(record, occurred)
+            if quake.key not in self._keys and occurred.timestamp() >= oldest:
+                added[quake.key] = quake
+        new = sorted(added.values(), key=lambda quake: quake.occurred)
+        for quake in new:
+            self._insert(quake)
+        return new
+
+    def _insert(self, quake: Earthquake) -> None:
+        """Write a quake into the next slot, evicting the oldest one."""
+        slot = self._next
+        if (evicted := self._quakes[slot]) is not None:
+            self._keys.discard(evicted.key)
+        self._quakes[slot] = quake
+        self._times[slot] = quake.occurred.timestamp()
+        self._magnitudes[slot] = (
+            quake.magnitude if quake.magnitude is not None else float("-inf")
+        )
+        self._keys.add(quake.key)
+        self._next = (slot + 1) % len(self._quakes)
+
+    @property
+    def latest(self) -> Earthquake | None:
+        """Return the most recent earthquake."""
+        if not self._keys:
+            return None
+        slot = max(
+            (slot for slot, quake in enumerate(self._quakes) if quake is not None),
+            key=self._times.__getitem__,
+        )
+        return self._quakes[slot]
+
+    def query(
+        self,
+        since: datetime,
+        min_magnitude: float | None = None,
+        within_km: float | None = None,
+        origin: tuple[float, float] | None = None,
+    ) -> list[Earthquake]:
+        """Return earthquakes since a time, newest first.
+
+        Optionally only those of at least a magnitude, and only those within
+        a distance in kilometres of an origin latitude and longitude.
+        """
+        after = since.timestamp()
+        floor = float("-inf") if min_magnitude is None else min_magnitude
+        matches = []
+        for slot, quake in enumerate(self._quakes):
+            if (
+                quake is None
+                or self._times[slot] < after
+                or self._magnitudes[slot] < floor
+            ):
+                continue
+            if within_km is not None and origin is not None:
+                if quake.latitude is None or quake.longitude is None:
+                    continue
+                meters = location_util.distance(
+                    origin[0], origin[1], quake.latitude, quake.longitude
+                )
+                if meters is None or meters > within_km * 1000:
+                    continue
+            matches.append(quake)
+        return sorted(matches, key=lambda quake: quake.occurred, reverse=True)
+
+    def largest(self, *args: Any, **kwargs: Any) -> Earthquake | None:
+        """Return the largest earthquake matching a query."""
+        return max(
+            (quake for quake in self.query(*args, **kwargs) if quake.magnitude is not None),
+            key=lambda quake: quake.magnitude,
+            default=None,
+        )
+
+    def as_records(self) -> list[dict[str, Any]]:
+        """Return the held earthquakes as dataset records for storage."""
+        return [quake.as_record() for quake in self._quakes if quake is not None]
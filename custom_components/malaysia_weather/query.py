@@ -0,0 +1,81 @@
+"""Query building for the data.gov.my API."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date, datetime
+
+from homeassistant.util import dt as dt_util
+
+from .const import TIMEZONE
+
+# Columns read by each consumer, nested columns use "__"
+FORECAST_COLUMNS = (
+    "location__location_id",
+    "date",
+    "morning_forecast",
+    "afternoon_forecast",
+    "night_forecast",
+    "summary_forecast",
+    "min_temp",
+    "max_temp",
+)
+LOCATION_COLUMNS = ("location__location_id", "location__location_name")
+WARNING_COLUMNS = (
+    "warning_issue__issued",
+    "valid_from",
+    "valid_to",
+    "heading_en",
+    "text_en",
+    "instruction_en",
+)
+EARTHQUAKE_COLUMNS = (
+    "localdatetime",
+    "lat",
+    "lon",
+    "magdefault",
+    "depth",
+    "location_original",
+    "n_distancemas",
+    "status",
+)
+
+
+class ApiQuery:
+    """Query parameters for a data.gov.my dataset.
+
+    Only the requested columns are returned, and date and timestamp bounds
+    are applied by the server, so rows and fields no consumer reads are
+    never sent.
+    """
+
+    __slots__ = ("_params",)
+
+    def __init__(self, columns: Iterable[str]) -> None:
+        """Initialize the query for a projection of the dataset."""
+        self._params: dict[str, str] = {"include": ",".join(columns)}
+
+    def dates(
+        self, column: str, start: date | None = None, end: date | None = None
+    ) -> ApiQuery:
+        """Limit the rows to a range of a date column."""
+        if start is not None:
+            self._params["date_start"] = f"{start.isoformat()}@{column}"
+        if end is not None:
+            self._params["date_end"] = f"{end.isoformat()}@{column}"
+        return self
+
+    def since(self, column: str, start: datetime) -> ApiQuery:
+        """Limit the rows to a timestamp column from a point in time."""
+        local = start.astimezone(dt_util.get_time_zone(TIMEZONE))
+        self._params["timestamp_start"] = f"{local:%Y-%m-%d %H:%M:%S}@{column}"
+        return self
+
+    @property
+    def params(self) -> dict[str, str]:
+        """Return the query string parameters."""
+        return dict(self._params)
+
+
+def malaysia_today() -> date:
+    """Return the current date in Malaysia."""
+    return dt_util.now(dt_util.get_time_zone(TIMEZONE)).date()
@@ -0,0 +1,37 @@
+"""Downscaled image renditions for Malaysia Weather integration."""
+from __future__ import annotations
+
+from io import BytesIO
+
+from PIL import Image
+
+from .const import IMAGE_RENDITION_QUALITY, IMAGE_RENDITIONS
+
+
+def latest_frame(image: bytes) -> Image.Image:
+    """Decode the latest frame of an image as RGB."""
+    with Image.open(BytesIO(image)) as source:
+        # Animated products end on their most recent frame
+        source.seek(getattr(source, "n_frames", 1) - 1)
+        return source.convert("RGB")
+
+
+def render_renditions(image: bytes) -> dict[str, bytes]:
+    """Decode an image once and encode every rendition of its latest frame."""
+    return encode_renditions(latest_frame(image))
+
+
+def encode_renditions(frame: Image.Image) -> dict[str, bytes]:
+    """Encode every rendition of a decoded frame, leaving the frame as is."""
+    renditions: dict[str, bytes] = {}
+    for name, size in IMAGE_RENDITIONS.items():
+        rendition = frame
+        if size and max(frame.size) > size:
+            rendition = frame.copy()
+            rendition.thumbnail((size, size))
+        buffer = BytesIO()
+        rendition.save(
+            buffer, format="JPEG", quality=IMAGE_RENDITION_QUALITY, optimize=True
+        )
+        renditions[name] = buffer.getvalue()
+    return renditions
@@ -0,0 +1,168 @@
+"""Per-host request scheduling for Malaysia Weather integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+import logging
+import random
+from time import monotonic
+from typing import Any
+
+import aiohttp
+import async_timeout
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_OPEN_INITIAL,
+    CIRCUIT_OPEN_MAX,
+    MAX_CONNECTIONS_PER_HOST,
+    RATE_LIMIT_BACKOFF_INITIAL,
+    RATE_LIMIT_BACKOFF_MAX,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_PER_SECOND,
+    STARTUP_JITTER,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HostUnavailableError(aiohttp.ClientError):
+    """Requests to a host are paused by rate limiting or the circuit breaker."""
+
+
+def phase_offset() -> float:
+    """Return a random delay that spreads startup requests apart."""
+    return random.uniform(0, STARTUP_JITTER)
+
+
+def _retry_after(response: aiohttp.ClientResponse) -> float | None:
+    """Return the delay requested by a Retry-After header, in seconds."""
+    if (value := response.headers.get(aiohttp.hdrs.RETRY_AFTER)) is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - dt_util.utcnow()).total_seconds(), 0)
+
+
+class HostScheduler:
+    """Admission control for the requests to one host.
+
+    A token bucket keeps the sustained request rate within budget while
+    allowing short bursts. A 429 response pauses the host for its
+    Retry-After, or for an exponential backoff when there is none. After
+    consecutive failures the circuit opens and requests fail fast until it
+    closes again; the next failure after that reopens it for twice as long.
+    """
+
+    def __init__(self, host: str) -> None:
+        """Initialize the scheduler."""
+        self.host = host
+        self._slots = asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+        self._tokens = float(RATE_LIMIT_BURST)
+        self._refilled_at = monotonic()
+        self._paused_until = 0.0
+        self._failures = 0
+        self._rate_limit_backoff = float(RATE_LIMIT_BACKOFF_INITIAL)
+        self._open_time = float(CIRCUIT_OPEN_INITIAL)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the scheduler state for diagnostics."""
+        return {
+            "tokens": round(self._tokens, 2),
+            "consecutive_failures": self._failures,
+            "paused_for": max(round(self._paused_until - monotonic()), 0),
+            "next_circuit_open_time": self._open_time,
+            "next_rate_limit_backoff": self._rate_limit_backoff,
+        }
+
+    def _check_paused(self) -> None:
+        """Raise if requests to the host are paused."""
+        if (remaining := self._paused_until - monotonic()) > 0:
+            raise HostUnavailableError(
+                f"Requests to {self.host} paused for {remaining:.0f} s"
+            )
+
+    async def _async_take_token(self) -> None:
+        """Wait for the token bucket to allow a request."""
+        while True:
+            now = monotonic()
+            self._tokens = min(
+                RATE_LIMIT_BURST,
+                self._tokens + (now - self._refilled_at) * RATE_LIMIT_PER_SECOND,
+            )
+            self._refilled_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / RATE_LIMIT_PER_SECOND)
+
+    @asynccontextmanager
+    async def async_slot(self, timeout: float) -> AsyncIterator[HostScheduler]:
+        """Hold a request slot, recording a failure if the request raises.
+
+        The timeout is applied here rather than by the caller, so a request
+        that times out is seen as a TimeoutError and counts as a failure.
+        """
+        self._check_paused()
+        async with self._slots:
+            await self._async_take_token()
+            self._check_paused()
+            try:
+                async with async_timeout.timeout(timeout):
+                    yield self
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                # Responses are already recorded by observe()
+                if not isinstance(
+                    err, (HostUnavailableError, aiohttp.ClientResponseError)
+                ):
+                    self._record_failure()
+                raise
+
+    def observe(self, response: aiohttp.ClientResponse) -> None:
+        """Record the outcome of a response, raising if it was rate limited."""
+        if response.status == 429:
+            delay = _retry_after(response)
+            if delay is None:
+                delay = self._rate_limit_backoff
+                self._rate_limit_backoff = min(
+                    self._rate_limit_backoff * 2, RATE_LIMIT_BACKOFF_MAX
+                )
+            self._pause(delay)
+            _LOGGER.warning(
+                "Rate limited by %s, pausing requests for %.0f s", self.host, delay
+            )
+            raise HostUnavailableError(f"Rate limited by {self.host}")
+        if response.status >= 500:
+            self._record_failure()
+            return
+        self._failures = 0
+        self._rate_limit_backoff = float(RATE_LIMIT_BACKOFF_INITIAL)
+        self._open_time = float(CIRCUIT_OPEN_INITIAL)
+
+    def _record_failure(self) -> None:
+        """Count a failure, opening the circuit once over the threshold."""
+        self._failures += 1
+        if self._failures < CIRCUIT_FAILURE_THRESHOLD:
+            return
+        self._pause(self._open_time)
+        _LOGGER.warning(
+            "%s failed %d times in a row, pausing requests for %.0f s",
+            self.host,
+            self._failures,
+            self._open_time,
+        )
+        self._open_time = min(self._open_time * 2, CIRCUIT_OPEN_MAX)
+
+    def _pause(self, delay: float) -> None:
+        """Pause requests to the host for a number of seconds."""
+        self._paused_until = max(self._paused_until, monotonic() + delay)
@@ -5,11 +5,12 @@ import logging
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN, SATELLITE_URLS
+from .const import DOMAIN, SATELLITE_URLS, SELECTED_IMAGERY, SIGNAL_IMAGERY_SELECTED
 
 _LOGGER = logging.getLogger(__name__)
 STORAGE_KEY = f"{DOMAIN}.satellite_selection"
@@ -21,9 +22,6 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Malaysia Weather select entities."""
-    if entry.data:
-        return
-
     store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
     stored = await store.async_load()
 
@@ -31,7 +29,11 @@ async def async_setup_entry(
     if stored and stored.get("option") in list(SATELLITE_URLS.keys()):
         initial_option = stored["option"]
 
-    async_add_entities([SatelliteImagerySelect(store, initial_option)])
+    # Image entities read the selection to decide which product to keep hot
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    entry_data[SELECTED_IMAGERY] = initial_option
+
+    async_add_entities([SatelliteImagerySelect(store, entry_data, initial_option)])
 
 class SatelliteImagerySelect(SelectEntity, RestoreEntity):
     """Representation of a Satellite Imagery select entity."""
@@ -40,16 +42,21 @@ class SatelliteImagerySelect(SelectEntity, RestoreEntity):
     _attr_name = "Satellite Imagery"
     _attr_options = list(SATELLITE_URLS.keys())
 
-    def __init__(self, store: Store, initial_option: str) -> None:
+    def __init__(self, store: Store, entry_data: dict, initial_option: str) -> None:
         """Initialize the select entity."""
         self._attr_unique_id = "malaysia_satellite_imagery"
         self._attr_current_option = initial_option  
         self._store = store
+        self._entry_data = entry_data
 
     async def async_added_to_hass(self) -> None:
         """Nothing to restore — already loaded before entity was created."""
         await super().async_added_to_hass()
         self.async_write_ha_state()
+        # Image entities set up before this one wait for the initial selection
+        async_dispatcher_send(
+            self.hass, SIGNAL_IMAGERY_SELECTED, self._attr_current_option
+        )
 
     @property
     def extra_state_attributes(self):
@@ -60,5 +67,7 @@ class SatelliteImagerySelect(SelectEntity, RestoreEntity):
         """Update the selected option."""
         if option in self._attr_options:
             self._attr_current_option = option
+            self._entry_data[SELECTED_IMAGERY] = option
             await self._store.async_save({"option": option})
             self.async_write_ha_state()
+            async_dispatcher_send(self.hass, SIGNAL_IMAGERY_SELECTED, option)
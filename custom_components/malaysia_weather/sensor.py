@@ -1,33 +1,36 @@
 """Sensor platform for Malaysia Weather integration."""
 from __future__ import annotations
 
-from datetime import timedelta
+import asyncio
+from datetime import datetime, timedelta
 import logging
 
-import aiohttp
-import async_timeout
-
 from homeassistant.components.sensor import (
     SensorEntity,
     SensorDeviceClass,
+    SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.components.select import SelectEntity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import Entity
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
-    WARNING_URL,
-    EARTHQUAKE_URL,
-    UPDATE_INTERVAL_WARNINGS,
     ATTRIBUTION,
+    CONF_LOCATION_ID,
+    CONF_LOCATION_NAME,
+    EARTHQUAKE_COORDINATOR,
+    FORECAST_COORDINATOR,
+    WARNING_COORDINATOR,
 )
+from .coordinator import EarthquakeCoordinator, ForecastCoordinator, WarningCoordinator
+from .entity import CachedCoordinatorEntity, LocationForecastEntity
+from .metrics import ENDPOINT_NAMES, Metrics, async_get_metrics
+from .models import FORECAST_PERIODS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,87 +39,135 @@ async def async_setup_entry(
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up Malaysia Weather warning sensors."""
-    # Only set up warning sensors for the warnings entry (empty data)
+    """Set up Malaysia Weather forecast or warning sensors."""
     if entry.data:
+        await _async_setup_location_entry(hass, entry, async_add_entities)
         return
 
-    warning_coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name="malaysia_weather_warnings",
-        update_method=fetch_warning_data,
-        update_interval=timedelta(seconds=UPDATE_INTERVAL_WARNINGS),
-    )
+    warning_coordinator = WarningCoordinator(hass)
+    earthquake_coordinator = EarthquakeCoordinator(hass)
 
-    earthquake_coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name="malaysia_weather_earthquake",
-        update_method=fetch_earthquake_data,
-        update_interval=timedelta(seconds=UPDATE_INTERVAL_WARNINGS),
+    # Cached payloads are served at once and revalidated in the background
+    await asyncio.gather(
+        warning_coordinator.async_restore_or_refresh(),
+        earthquake_coordinator.async_restore_or_refresh(),
     )
+    # The get_earthquakes service queries this coordinator's history
+    hass.data[DOMAIN][entry.entry_id][EARTHQUAKE_COORDINATOR] = earthquake_coordinator
+    hass.data[DOMAIN][entry.entry_id][WARNING_COORDINATOR] = warning_coordinator
 
-    await warning_coordinator.async_config_entry_first_refresh()
-    await earthquake_coordinator.async_config_entry_first_refresh()
-
+    metrics = async_get_metrics(hass)
     async_add_entities([
         WeatherWarningSensor(warning_coordinator),
-        EarthquakeWarningSensor(earthquake_coordinator)
+        EarthquakeWarningSensor(earthquake_coordinator),
+        *(EndpointMetricsSensor(metrics, name) for name in ENDPOINT_NAMES.values()),
+        *(EndpointLastSuccessSensor(metrics, name) for name in ENDPOINT_NAMES.values()),
+        StateWritesSensor(metrics),
     ])
 
-async def fetch_warning_data() -> dict:
-    """Fetch warning data from API."""
-    async with async_timeout.timeout(10):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(WARNING_URL) as response:
-                return await response.json()
-
-async def fetch_earthquake_data() -> dict:
-    """Fetch earthquake data from API."""
-    async with async_timeout.timeout(10):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(EARTHQUAKE_URL) as response:
-                return await response.json()
-
-class WeatherWarningSensor(CoordinatorEntity, SensorEntity):
-    """Implementation of Malaysia Weather Warning sensor."""
+async def _async_setup_location_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up part of day forecast sensors for a location."""
+    coordinator: ForecastCoordinator = hass.data[DOMAIN][FORECAST_COORDINATOR]
+    await coordinator.async_ensure_first_refresh()
+
+    async_add_entities(
+        ForecastPeriodSensor(
+            coordinator,
+            entry.data[CONF_LOCATION_ID],
+            entry.data[CONF_LOCATION_NAME],
+            period,
+        )
+        for period in FORECAST_PERIODS
+    )
+
+class ForecastPeriodSensor(LocationForecastEntity, SensorEntity):
+    """Today's forecast for one part of the day at a location."""
 
     _attr_has_entity_name = True
-    _attr_name = "Weather Warning"
-    _attr_device_class = SensorDeviceClass.ENUM
     _attr_attribution = ATTRIBUTION
 
-    def __init__(self, coordinator: DataUpdateCoordinator) -> None:
+    def __init__(
+        self,
+        coordinator: ForecastCoordinator,
+        location_id: str,
+        location_name: str,
+        period: str,
+    ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
-        self._attr_unique_id = "malaysia_weather_warning"
+        super().__init__(coordinator, location_id)
+        self._period = period
+        self._attr_unique_id = f"malaysia_weather_{location_id}_{period}"
+        self._attr_name = f"{location_name} {period.title()} Forecast"
 
     @property
     def native_value(self) -> str | None:
-        """Return the state of the sensor."""
-        if not self.coordinator.data:
-            return None
-        try:
-            return self.coordinator.data[0]["heading_en"]
-        except (KeyError, IndexError):
+        """Return the forecast summary for this part of the day."""
+        if (current := self._current) is None:
             return None
+        return current.period_summary(self._period)
 
     @property
     def extra_state_attributes(self) -> dict:
-        """Return additional warning information."""
-        if not self.coordinator.data or not self.coordinator.data[0]:
-            return {}
-        
-        warning = self.coordinator.data[0]
+        """Return the condition and date of the forecast."""
+        if (current := self._current) is None:
+            return self.coordinator.cache_attributes
         return {
-            "valid_from": warning.get("valid_from"),
-            "valid_to": warning.get("valid_to"),
-            "text": warning.get("text_en"),
-            "instruction": warning.get("instruction_en"),
+            "condition": current.period_condition(self._period),
+            "date": current.date.isoformat(),
+            **self.coordinator.cache_attributes,
+        }
+
+class WeatherWarningSensor(CachedCoordinatorEntity, SensorEntity):
+    """Implementation of Malaysia Weather Warning sensor."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Weather Warning"
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_attribution = ATTRIBUTION
+
+    def __init__(self, coordinator: WarningCoordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = "malaysia_weather_warning"
+        self._attr_extra_state_attributes = {}
+        self._last_available = True
+        self._update_from_data()
+
+    def _update_from_data(self) -> bool:
+        """Rebuild state from the active warnings, return True if it changed."""
+        active = self.coordinator.data.active if self.coordinator.data else []
+        # The first warning keeps its fields at the top level, as before
+        first = active[0].as_dict() if active else {}
+        native_value = first.pop("heading", None)
+        attributes = {
+            **first,
+            "count": len(active),
+            "warnings": [warning.as_dict() for warning in active],
+            **self.coordinator.cache_attributes,
         }
+        if (
+            native_value == self._attr_native_value
+            and attributes == self._attr_extra_state_attributes
+        ):
+            return False
+        self._attr_native_value = native_value
+        self._attr_extra_state_attributes = attributes
+        return True
 
-class EarthquakeWarningSensor(CoordinatorEntity, SensorEntity):
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the active warnings or availability change."""
+        available = self.available
+        changed = self._update_from_data()
+        if changed or available != self._last_available:
+            self._last_available = available
+            self.async_write_ha_state()
+
+class EarthquakeWarningSensor(CachedCoordinatorEntity, SensorEntity):
     """Implementation of Malaysia Earthquake Warning sensor."""
 
     _attr_has_entity_name = True
@@ -124,7 +175,7 @@ class EarthquakeWarningSensor(CoordinatorEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.ENUM
     _attr_attribution = ATTRIBUTION
 
-    def __init__(self, coordinator: DataUpdateCoordinator) -> None:
+    def __init__(self, coordinator: EarthquakeCoordinator) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._attr_unique_id = "malaysia_earthquake_warning"
@@ -132,24 +183,107 @@ class EarthquakeWarningSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self) -> str | None:
         """Return the state of the sensor."""
-        if not self.coordinator.data:
-            return None
-        try:
-            return self.coordinator.data[0]["status"]
-        except (KeyError, IndexError):
+        if (quake := self.coordinator.history.latest) is None:
             return None
+        return quake.status
 
     @property
     def extra_state_attributes(self) -> dict:
         """Return additional earthquake information."""
-        if not self.coordinator.data or not self.coordinator.data[0]:
-            return {}
-        
-        quake = self.coordinator.data[0]
+        history = self.coordinator.history
+        if (quake := history.latest) is None:
+            return self.coordinator.cache_attributes
+
+        since = dt_util.utcnow() - timedelta(hours=24)
+        largest = history.largest(since)
         return {
-            "magnitude": quake.get("magdefault"),
-            "depth": quake.get("depth"),
-            "location": quake.get("location_original"),
-            "distance_from_malaysia": quake.get("n_distancemas"),
-            "datetime": quake.get("localdatetime"),
+            **quake.as_dict(),
+            "count_24h": len(history.query(since)),
+            "largest_magnitude_24h": largest.magnitude if largest else None,
+            **self.coordinator.cache_attributes,
         }
+
+class EndpointMetricsSensor(SensorEntity):
+    """Request, parse and freshness metrics of one endpoint."""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_native_unit_of_measurement = "requests"
+    # Metrics change on every request, they are sampled instead of pushed
+    _attr_should_poll = True
+
+    def __init__(self, metrics: Metrics, endpoint: str) -> None:
+        """Initialize the sensor."""
+        self._metrics = metrics
+        self._endpoint = endpoint
+        self._attr_name = f"{endpoint.title()} Requests"
+        self._attr_unique_id = (
+            f"malaysia_weather_metrics_{endpoint.lower().replace(' ', '_')}"
+        )
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of requests made to the endpoint."""
+        return self._metrics.named(self._endpoint).requests
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the endpoint metrics that only change with requests."""
+        # The age changes on every poll, the last success sensor covers it
+        metrics = self._metrics.named(self._endpoint).as_dict()
+        del metrics["last_success_age"]
+        return metrics
+
+class EndpointLastSuccessSensor(SensorEntity):
+    """Time of the last successful request to one endpoint."""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_should_poll = True
+
+    def __init__(self, metrics: Metrics, endpoint: str) -> None:
+        """Initialize the sensor."""
+        self._metrics = metrics
+        self._endpoint = endpoint
+        self._attr_name = f"{endpoint.title()} Last Success"
+        self._attr_unique_id = (
+            f"malaysia_weather_metrics_{endpoint.lower().replace(' ', '_')}"
+            "_last_success"
+        )
+
+    @property
+    def native_value(self) -> datetime | None:
+        """Return when the endpoint last answered successfully."""
+        return self._metrics.named(self._endpoint).last_success
+
+class StateWritesSensor(SensorEntity):
+    """Number of state writes made by the integration's entities."""
+
+    _attr_has_entity_name = True
+    _attr_name = "State Writes"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_native_unit_of_measurement = "writes"
+    _attr_should_poll = True
+    # One counter per entity, grows with the number of locations
+    _unrecorded_attributes = frozenset({"by_entity"})
+
+    def __init__(self, metrics: Metrics) -> None:
+        """Initialize the sensor."""
+        self._metrics = metrics
+        self._attr_unique_id = "malaysia_weather_metrics_state_writes"
+
+    @property
+    def native_value(self) -> int:
+        """Return the total number of state writes."""
+        return sum(self._metrics.state_writes.values())
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the state writes of each entity."""
+        return {"by_entity": dict(self._metrics.state_writes)}
@@ -0,0 +1,74 @@
+"""Services for Malaysia Weather integration."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, EARTHQUAKE_COORDINATOR
+
+SERVICE_GET_EARTHQUAKES = "get_earthquakes"
+
+ATTR_HOURS = "hours"
+ATTR_MIN_MAGNITUDE = "min_magnitude"
+ATTR_WITHIN_KM = "within_km"
+
+GET_EARTHQUAKES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_HOURS, default=24): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_MIN_MAGNITUDE): vol.Coerce(float),
+        vol.Optional(ATTR_WITHIN_KM): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_get_earthquakes(call: ServiceCall) -> ServiceResponse:
+        """Query the recent earthquake history without a request."""
+        coordinator = next(
+            (
+                entry_data[EARTHQUAKE_COORDINATOR]
+                for entry_data in hass.data.get(DOMAIN, {}).values()
+                if isinstance(entry_data, dict) and EARTHQUAKE_COORDINATOR in entry_data
+            ),
+            None,
+        )
+        if coordinator is None:
+            raise HomeAssistantError("Warnings & Imagery is not set up")
+
+        history = coordinator.history
+        query = {
+            "since": dt_util.utcnow() - timedelta(hours=call.data[ATTR_HOURS]),
+            "min_magnitude": call.data.get(ATTR_MIN_MAGNITUDE),
+            # Distances are measured from the Home Assistant home location
+            "within_km": call.data.get(ATTR_WITHIN_KM),
+            "origin": (hass.config.latitude, hass.config.longitude),
+        }
+        largest = history.largest(**query)
+        return {
+            "earthquakes": [quake.as_dict() for quake in history.query(**query)],
+            "largest": largest.as_dict() if largest else None,
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_EARTHQUAKES,
+        async_get_earthquakes,
+        schema=GET_EARTHQUAKES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
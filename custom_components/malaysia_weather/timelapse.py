@@ -0,0 +1,207 @@
+"""Imagery frame history and time-lapse for Malaysia Weather integration."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime
+from io import BytesIO
+import logging
+import struct
+
+from PIL import Image
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    FRAME_HISTORY_MAX_AGE,
+    FRAME_HISTORY_SIZE,
+    IMAGE_RENDITIONS,
+    TIMELAPSE_FRAME_DELAY,
+    TIMELAPSE_MAX_SIZE,
+)
+from .imagecache import ImageCache
+from .renditions import encode_renditions, latest_frame
+
+_LOGGER = logging.getLogger(__name__)
+
+FRAME_VARIANT = "frame"
+
+_IMAGE_SEPARATOR = 0x2C
+_EXTENSION_INTRODUCER = 0x21
+_TRAILER = b";"
+# Application extension that makes the animation loop forever
+_LOOP_FOREVER = b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00"
+
+
+def _skip_sub_blocks(data: bytes, pos: int) -> int:
+    """Return the position after a chain of GIF data sub-blocks."""
+    while (size := data[pos]) != 0:
+        pos += size + 1
+    return pos + 1
+
+
+def _image_block(gif: bytes) -> bytes:
+    """Extract the first image of a GIF as a self-contained block.
+
+    The block is the image descriptor moved to the origin, a local color
+    table (the global one when the image has none) and the LZW data, so it
+    can be stitched into any GIF as is.
+    """
+    if gif[:6] not in (b"GIF87a", b"GIF89a"):
+        raise ValueError("Not a GIF image")
+    screen_flags = gif[10]
+    pos = 13
+    global_table = b""
+    if screen_flags & 0x80:
+        end = pos + 3 * (2 << (screen_flags & 0x07))
+        global_table = gif[pos:end]
+        pos = end
+    while pos < len(gif):
+        if gif[pos] == _EXTENSION_INTRODUCER:
+            pos = _skip_sub_blocks(gif, pos + 2)
+        elif gif[pos] == _IMAGE_SEPARATOR:
+            descriptor = bytearray(gif[pos : pos + 10])
+            pos += 10
+            if descriptor[9] & 0x80:
+                end = pos + 3 * (2 << (descriptor[9] & 0x07))
+                table = gif[pos:end]
+                pos = end
+            elif global_table:
+                table = global_table
+                # Keep the interlace flag, declare the global table as local
+                descriptor[9] = (descriptor[9] & 0x40) | 0x80 | (screen_flags & 0x07)
+            else:
+                raise ValueError("GIF image has no color table")
+            descriptor[1:5] = bytes(4)
+            # LZW minimum code size, then the image data sub-blocks
+            start = pos
+            pos = _skip_sub_blocks(gif, pos + 1)
+            return bytes(descriptor) + table + gif[start:pos]
+        else:
+            break
+    raise ValueError("GIF has no image")
+
+
+def encode_frame(frame: Image.Image) -> bytes:
+    """Encode a decoded frame as a time-lapse GIF block."""
+    frame = frame.copy()
+    frame.thumbnail((TIMELAPSE_MAX_SIZE, TIMELAPSE_MAX_SIZE))
+    buffer = BytesIO()
+    frame.quantize(colors=256).save(buffer, format="GIF")
+    return _image_block(buffer.getvalue())
+
+
+def render_frame(image: bytes) -> dict[str, bytes]:
+    """Decode an image and encode its latest frame as a time-lapse block."""
+    return {FRAME_VARIANT: encode_frame(latest_frame(image))}
+
+
+def render_frame_and_renditions(image: bytes) -> dict[str, bytes]:
+    """Decode an image once for both its time-lapse block and renditions."""
+    frame = latest_frame(image)
+    return {FRAME_VARIANT: encode_frame(frame), **encode_renditions(frame)}
+
+
+def stitch_frames(blocks: list[bytes]) -> bytes:
+    """Join encoded frame blocks into a looping animated GIF.
+
+    Frames are only encoded once, when they arrive, so building the
+    animation is a concatenation of the stored blocks.
+    """
+    width = max(int.from_bytes(block[5:7], "little") for block in blocks)
+    height = max(int.from_bytes(block[7:9], "little") for block in blocks)
+    parts = [b"GIF89a", struct.pack("<HHBBB", width, height, 0, 0, 0), _LOOP_FOREVER]
+    for index, block in enumerate(blocks):
+        # Hold the newest frame a little longer before looping
+        delay = TIMELAPSE_FRAME_DELAY * (4 if index == len(blocks) - 1 else 1)
+        parts.append(struct.pack("<BBBBHBB", 0x21, 0xF9, 4, 0x04, delay, 0, 0))
+        parts.append(block)
+    parts.append(_TRAILER)
+    return b"".join(parts)
+
+
+class FrameHistory:
+    """Recent distinct frames of one imagery product, oldest first.
+
+    Frames are keyed by the digest of their image in the image cache, so a
+    re-served image is not added twice. Frames beyond FRAME_HISTORY_SIZE or
+    older than FRAME_HISTORY_MAX_AGE are evicted, and their cached files
+    are for the caller to remove.
+    """
+
+    def __init__(self, cache: ImageCache) -> None:
+        """Initialize the history."""
+        self._cache = cache
+        self._frames: dict[str, float] = {}
+
+    @property
+    def digests(self) -> list[str]:
+        """Return the digests of the frames, oldest first."""
+        return list(self._frames)
+
+    @property
+    def updated(self) -> datetime | None:
+        """Return when the newest frame was fetched."""
+        if not self._frames:
+            return None
+        return dt_util.utc_from_timestamp(max(self._frames.values()))
+
+    def __contains__(self, digest: object) -> bool:
+        """Return True if a frame is held."""
+        return digest in self._frames
+
+    def as_list(self) -> list[list]:
+        """Return the frames for storage."""
+        return [[digest, fetched] for digest, fetched in self._frames.items()]
+
+    async def async_restore(self, stored: Iterable[list]) -> None:
+        """Restore stored frames whose encoded block is still cached."""
+        for digest, fetched in stored:
+            if await self._cache.async_contains(digest, FRAME_VARIANT):
+                self._frames[digest] = fetched
+
+    async def async_add(
+        self, digest: str, fetched_at: datetime, *, renditions: bool = False
+    ) -> list[str]:
+        """Encode and add a new frame, return the digests evicted.
+
+        With renditions, the image renditions are encoded from the same
+        decode as the frame.
+        """
+        if digest in self._frames:
+            return []
+        try:
+            if renditions:
+                await self._cache.async_render_many(
+                    digest,
+                    (FRAME_VARIANT, *IMAGE_RENDITIONS),
+                    render_frame_and_renditions,
+                )
+            else:
+                await self._cache.async_render_many(
+                    digest, (FRAME_VARIANT,), render_frame
+                )
+        except (OSError, ValueError) as err:
+            _LOGGER.warning("Unable to add time-lapse frame: %s", err)
+            return []
+        self._frames[digest] = fetched_at.timestamp()
+        return self._evict(fetched_at.timestamp())
+
+    def _evict(self, now: float) -> list[str]:
+        """Drop frames over the size or age limit, always keeping the newest."""
+        evicted: list[str] = []
+        for digest, fetched in list(self._frames.items())[:-1]:
+            if (
+                len(self._frames) <= FRAME_HISTORY_SIZE
+                and now - fetched <= FRAME_HISTORY_MAX_AGE
+            ):
+                break
+            del self._frames[digest]
+            evicted.append(digest)
+        return evicted
+
+    async def async_timelapse(self) -> bytes | None:
+        """Return the frames as an animated GIF."""
+        blocks = await self._cache.async_read_all(list(self._frames), FRAME_VARIANT)
+        if not blocks:
+            return None
+        return stitch_frames(blocks)
@@ -1,13 +1,9 @@
 """Weather platform for Malaysia Weather integration."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
 import logging
 from typing import Any
 
-import aiohttp
-import async_timeout
-
 from homeassistant.components.weather import (
     WeatherEntity,
     WeatherEntityFeature,
@@ -17,127 +13,118 @@ from homeassistant.const import (
     UnitOfTemperature,
 )
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
 
 from .const import (
+    AFFECTED_LOCATIONS,
     DOMAIN,
-    FORECAST_URL,
     CONF_LOCATION_ID,
     CONF_LOCATION_NAME,
-    UPDATE_INTERVAL_FORECAST,
-    CONDITION_MAPPING,
     ATTRIBUTION,
+    FORECAST_COORDINATOR,
+    SIGNAL_AFFECTED_LOCATIONS,
 )
+from .coordinator import ForecastCoordinator
+from .entity import LocationForecastEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+# Conditions whose Material Design icon does not follow "mdi:weather-<condition>"
+CONDITION_ICONS = {
+    "partlycloudy": "mdi:weather-partly-cloudy",
+    "unknown": "mdi:weather-partly-cloudy",
+}
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Malaysia Weather platform."""
-    # Skip setup for the warnings entry (empty data)
-    if not config_entry.data:
-        return
     location_id = config_entry.data[CONF_LOCATION_ID]
     location_name = config_entry.data[CONF_LOCATION_NAME]
 
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=f"malaysia_weather_{location_id}",
-        update_method=lambda: fetch_weather_data(location_id),
-        update_interval=timedelta(seconds=UPDATE_INTERVAL_FORECAST),
-    )
-
-    await coordinator.async_config_entry_first_refresh()
+    # All locations share one coordinator, only the first entry fetches
+    coordinator: ForecastCoordinator = hass.data[DOMAIN][FORECAST_COORDINATOR]
+    await coordinator.async_ensure_first_refresh()
 
     async_add_entities([MalaysiaWeather(coordinator, location_id, location_name)])
 
-async def fetch_weather_data(location_id: str) -> dict:
-    """Fetch weather data from API."""
-    async with async_timeout.timeout(10):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{FORECAST_URL}?contains={location_id}@location__location_id"
-            ) as response:
-                return await response.json()
-
-class MalaysiaWeather(CoordinatorEntity, WeatherEntity):
+class MalaysiaWeather(LocationForecastEntity, WeatherEntity):
     """Implementation of Malaysia Weather."""
 
     _attr_has_entity_name = True
     _attr_native_temperature_unit = UnitOfTemperature.CELSIUS
-    _attr_supported_features = WeatherEntityFeature.FORECAST_DAILY
+    _attr_supported_features = (
+        WeatherEntityFeature.FORECAST_DAILY | WeatherEntityFeature.FORECAST_TWICE_DAILY
+    )
     _attr_attribution = ATTRIBUTION
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator,
+        coordinator: ForecastCoordinator,
         location_id: str,
         location_name: str
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
-        self._location_id = location_id
+        super().__init__(coordinator, location_id)
         self._location_name = location_name
         self._attr_unique_id = f"malaysia_weather_{location_id}"
         self._attr_name = location_name
 
+    async def async_added_to_hass(self) -> None:
+        """Follow the warnings affecting this location when entity is added."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_AFFECTED_LOCATIONS, self.async_write_ha_state
+            )
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the age of the forecast data and warnings for this location."""
+        warnings = self.hass.data[DOMAIN].get(AFFECTED_LOCATIONS, {}).get(
+            self._location_id, []
+        )
+        return {
+            **self.coordinator.cache_attributes,
+            "warning_active": bool(warnings),
+            "active_warnings": warnings,
+        }
+
     @property
     def icon(self) -> str:
         """Return the icon to use in the frontend."""
-        condition = self.condition
-        if condition is None:
+        if (current := self._current) is None:
             return "mdi:weather-partly-cloudy"
-        return f"mdi:weather-{condition}"
+        return CONDITION_ICONS.get(
+            current.condition, f"mdi:weather-{current.condition}"
+        )
 
     @property
     def native_temperature(self) -> float | None:
         """Return the current temperature."""
-        if not self.coordinator.data:
-            return None
-        try:
-            return float(self.coordinator.data[0]["max_temp"])
-        except (KeyError, IndexError, ValueError):
+        if (current := self._current) is None:
             return None
+        return current.max_temp
 
     @property
     def condition(self) -> str | None:
         """Return the current condition."""
-        if not self.coordinator.data:
-            return None
-        try:
-            forecast = self.coordinator.data[0]["summary_forecast"]
-            return CONDITION_MAPPING.get(forecast, "unknown")
-        except (KeyError, IndexError):
+        if (current := self._current) is None:
             return None
+        return current.condition
 
     async def async_forecast_daily(self) -> list[dict[str, Any]] | None:
-        """Return the daily forecast."""
-        if not self.coordinator.data:
+        """Return the daily forecast, memoized until the next refresh."""
+        if not (forecast := self._forecast):
             return None
+        return forecast.forecast_daily()
 
-        forecast_data = []
-        for daily_data in self.coordinator.data:
-            try:
-                forecast_data.append({
-                    "datetime": datetime.strptime(
-                        daily_data["date"], "%Y-%m-%d"
-                    ).isoformat(),
-                    "native_temperature": float(daily_data["max_temp"]),
-                    "native_templow": float(daily_data["min_temp"]),
-                    "condition": CONDITION_MAPPING.get(
-                        daily_data["summary_forecast"], "unknown"
-                    ),
-                })
-            except (KeyError, ValueError) as err:
-                _LOGGER.error("Error parsing forecast data: %s", err)
-                continue
-                
-        return sorted(forecast_data, key=lambda x: x["datetime"])
+    async def async_forecast_twice_daily(self) -> list[dict[str, Any]] | None:
+        """Return the day and night forecast, memoized until the next refresh."""
+        if not (forecast := self._forecast):
+            return None
+        return forecast.forecast_twice_daily()
@@ -0,0 +1 @@
+"""Tests for the Malaysia Weather integration."""
@@ -0,0 +1,274 @@
+"""Fixtures for Malaysia Weather tests."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from contextlib import ExitStack
+from datetime import timedelta
+from hashlib import md5
+from io import BytesIO
+from random import Random
+from typing import Any
+from unittest.mock import patch
+from urllib.parse import urlsplit
+
+from aiohttp import web
+from PIL import Image
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+
+from custom_components.malaysia_weather import coordinator, locations, metrics
+from custom_components.malaysia_weather.const import (
+    CONF_LOCATION_ID,
+    CONF_LOCATION_NAME,
+    DOMAIN,
+    EARTHQUAKE_URL,
+    FORECAST_URL,
+    SATELLITE_URLS,
+    TIMEZONE,
+    WARNING_URL,
+)
+
+FORECAST_DAYS = 7
+
+
+def forecast_records(location_ids: list[str]) -> list[dict[str, Any]]:
+    """Return a week of forecast records for each location."""
+    today = dt_util.now(dt_util.get_time_zone(TIMEZONE)).date()
+    return [
+        {
+            "location": {
+                "location_id": location_id,
+                "location_name": f"Location {location_id}",
+            },
+            "date": (today + timedelta(days=offset)).isoformat(),
+            "morning_forecast": "Berawan",
+            "afternoon_forecast": "Ribut petir di beberapa tempat",
+            "night_forecast": "Tiada hujan",
+            "summary_forecast": "Ribut petir di beberapa tempat",
+            "min_temp": 24 + offset % 2,
+            "max_temp": 32 + offset % 3,
+        }
+        for location_id in location_ids
+        for offset in range(FORECAST_DAYS)
+    ]
+
+
+async def async_setup_locations(
+    hass: HomeAssistant, stand_in: StandIn, count: int
+) -> list[MockConfigEntry]:
+    """Set up a location entry for each of count forecast locations."""
+    location_ids = [f"Ds{index:03}" for index in range(count)]
+    stand_in.forecast = forecast_records(location_ids)
+    entries = [
+        MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Location {location_id}",
+            unique_id=location_id,
+            data={
+                CONF_LOCATION_ID: location_id,
+                CONF_LOCATION_NAME: f"Location {location_id}",
+            },
+        )
+        for location_id in location_ids
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    return entries
+
+
+async def async_setup_warnings_entry(hass: HomeAssistant) -> MockConfigEntry:
+    """Set up the warnings and imagery entry."""
+    entry = MockConfigEntry(domain=DOMAIN, title="Warnings & Imagery", data={})
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def async_unload(hass: HomeAssistant, entries: list[MockConfigEntry]) -> None:
+    """Unload config entries."""
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+def _gif() -> bytes:
+    """Return a small two-frame animated GIF."""
+    frames = [Image.new("P", (64, 48), color) for color in (1, 2)]
+    buffer = BytesIO()
+    frames[0].save(buffer, format="GIF", save_all=True, append_images=frames[1:])
+    return buffer.getvalue()
+
+
+class StandIn:
+    """Local stand-in for the data.gov.my and MET Malaysia endpoints.
+
+    Every request is recorded with the bytes sent for it. Records are padded
+    with an unrequested column of padding bytes and projected on the include
+    parameter like the real API. Responses can be delayed by a latency, and
+    paths listed in failing, or a seeded error_rate of the requests to any
+    path, are answered with a server error. Images carry an ETag and are
+    revalidated with 304 responses.
+
+    The latency sleeps on the event loop, so it cannot be combined with a
+    frozen clock.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the stand-in with empty datasets."""
+        self.forecast: list[dict[str, Any]] = []
+        self.warnings: list[dict[str, Any]] = []
+        self.earthquakes: list[dict[str, Any]] = []
+        self.image = _gif()
+        self.padding = 0
+        self.latency = 0.0
+        self.failing: set[str] = set()
+        self.error_rate = 0.0
+        self.requests: list[tuple[str, str, dict[str, str]]] = []
+        self.sent: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.base_url = ""
+        self._random: dict[str, Random] = {}
+
+    def application(self) -> web.Application:
+        """Return the aiohttp application serving the endpoints."""
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", self._handle)
+        return app
+
+    def url(self, url: str) -> str:
+        """Return the stand-in URL replacing a real endpoint."""
+        return f"{self.base_url}{urlsplit(url).path}"
+
+    def count(self, url: str, column: str | None = None) -> int:
+        """Return the requests made to an endpoint, optionally for a column."""
+        path = urlsplit(url).path
+        return sum(
+            1
+            for _, request_path, query in self.requests
+            if request_path == path
+            and (column is None or column in query.get("include", "").split(","))
+        )
+
+    def _failed(self, path: str) -> bool:
+        """Return True if a request to a path is answered with an error."""
+        if path in self.failing:
+            return True
+        if not self.error_rate:
+            return False
+        # One generator per path keeps the errors independent of other paths
+        generator = self._random.setdefault(path, Random(path))
+        return generator.random() < self.error_rate
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        """Answer a request from the datasets."""
+        self.requests.append((request.method, request.path, dict(request.query)))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._failed(request.path):
+            self.errors[request.path] += 1
+            raise web.HTTPInternalServerError
+        datasets = {
+            urlsplit(FORECAST_URL).path: self.forecast,
+            urlsplit(WARNING_URL).path: self.warnings,
+            urlsplit(EARTHQUAKE_URL).path: self.earthquakes,
+        }
+        if (dataset := datasets.get(request.path)) is not None:
+            columns = request.query.get("include")
+            response = web.json_response(
+                [
+                    _project(record | {"padding": "x" * self.padding}, columns)
+                    for record in dataset
+                ]
+            )
+        else:
+            etag = f'"{md5(self.image).hexdigest()}"'
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers={"ETag": etag})
+            response = web.Response(
+                body=self.image, content_type="image/gif", headers={"ETag": etag}
+            )
+        if request.method != "HEAD":
+            self.sent[request.path] += len(response.body)
+        return response
+
+
+def _project(record: dict[str, Any], columns: str | None) -> dict[str, Any]:
+    """Return the included columns of a record, nested columns use "__"."""
+    if columns is None:
+        return record
+    projected: dict[str, Any] = {}
+    for column in columns.split(","):
+        *parents, leaf = column.split("__")
+        source, target = record, projected
+        for parent in parents:
+            source = source.get(parent, {})
+            target = target.setdefault(parent, {})
+        if leaf in source:
+            target[leaf] = source[leaf]
+    return projected
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Enable the integration in every test."""
+
+
+@pytest.fixture
+async def stand_in(
+    hass: HomeAssistant, socket_enabled: None
+) -> AsyncIterator[StandIn]:
+    """Serve the endpoints locally and point the integration at them.
+
+    Depending on hass shuts the server down before the test checks for
+    lingering tasks, and requests still delayed by a latency are cancelled.
+    """
+    server = StandIn()
+    runner = web.AppRunner(server.application(), handler_cancellation=True)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    server.base_url = f"http://{host}:{port}"
+    with ExitStack() as stack:
+        for patcher in _url_patchers(server):
+            stack.enter_context(patcher)
+        yield server
+    await runner.cleanup()
+
+
+@pytest.fixture
+def no_response_memo() -> Iterator[None]:
+    """Make every refresh reach the stand-in instead of the response memo."""
+    with patch("custom_components.malaysia_weather.api.RESPONSE_MEMO_TTL", 0):
+        yield
+
+
+def _url_patchers(server: StandIn) -> list[Any]:
+    """Return patchers replacing every endpoint URL with the stand-in's."""
+    return [
+        patch.multiple(
+            coordinator,
+            FORECAST_URL=server.url(FORECAST_URL),
+            WARNING_URL=server.url(WARNING_URL),
+            EARTHQUAKE_URL=server.url(EARTHQUAKE_URL),
+        ),
+        patch.object(locations, "FORECAST_URL", server.url(FORECAST_URL)),
+        patch.dict(
+            SATELLITE_URLS,
+            {name: server.url(url) for name, url in SATELLITE_URLS.items()},
+        ),
+        # Keep the metrics of each endpoint under its usual name
+        patch.dict(
+            metrics.ENDPOINT_NAMES,
+            {server.url(url): name for url, name in metrics.ENDPOINT_NAMES.items()},
+        ),
+    ]
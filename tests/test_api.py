@@ -0,0 +1,35 @@
+"""Tests for the Malaysia Weather HTTP client."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.malaysia_weather.api import async_get_api
+from custom_components.malaysia_weather.const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    WARNING_URL,
+)
+from custom_components.malaysia_weather.metrics import async_get_metrics
+from custom_components.malaysia_weather.scheduler import HostUnavailableError
+
+from .conftest import StandIn
+
+
+async def test_timeouts_open_circuit(hass: HomeAssistant, stand_in: StandIn) -> None:
+    """Test a hanging endpoint is counted as failing and opens the circuit."""
+    api = async_get_api(hass)
+    url = stand_in.url(WARNING_URL)
+    stand_in.latency = 0.5
+
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        with pytest.raises(asyncio.TimeoutError):
+            await api.async_get_json(url, timeout=0.05)
+    with pytest.raises(HostUnavailableError):
+        await api.async_get_json(url, timeout=0.05)
+
+    assert stand_in.count(WARNING_URL) == CIRCUIT_FAILURE_THRESHOLD
+    metrics = async_get_metrics(hass).named("warnings")
+    assert metrics.requests == metrics.errors == CIRCUIT_FAILURE_THRESHOLD
@@ -0,0 +1,23 @@
+"""Tests for the Malaysia Weather condition classifier."""
+from __future__ import annotations
+
+from custom_components.malaysia_weather.conditions import (
+    UNKNOWN_CONDITION,
+    ConditionClassifier,
+)
+
+
+def test_classify_keywords() -> None:
+    """Test phrases resolve by keyword priority, ignoring qualifiers."""
+    classifier = ConditionClassifier()
+    assert classifier.classify("Ribut petir di beberapa tempat") == "lightning-rainy"
+    assert classifier.classify("Tiada hujan") == "sunny"
+    assert classifier.classify(None) == UNKNOWN_CONDITION
+
+
+def test_unmapped_counted_once_per_classification() -> None:
+    """Test cached lookups of an unmapped phrase are not counted again."""
+    classifier = ConditionClassifier()
+    for _ in range(3):
+        assert classifier.classify("Salji") == UNKNOWN_CONDITION
+    assert classifier.unmapped == {"Salji": 1}
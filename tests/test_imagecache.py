@@ -0,0 +1,38 @@
+"""Tests for the Malaysia Weather image cache."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.malaysia_weather.const import IMAGE_WRITE_BUFFER
+from custom_components.malaysia_weather.imagecache import async_get_image_cache
+
+
+async def test_store_buffers_chunks(hass: HomeAssistant) -> None:
+    """Test a download larger than the write buffer is stored whole."""
+    cache = async_get_image_cache(hass)
+    chunk = b"x" * (IMAGE_WRITE_BUFFER // 3)
+
+    async def _chunks() -> AsyncIterator[bytes]:
+        for _ in range(7):
+            yield chunk
+
+    digest, size = await cache.async_store(_chunks())
+
+    assert size == 7 * len(chunk)
+    assert await cache.async_read(digest) == chunk * 7
+
+
+async def test_remove_keeps_referenced_images(hass: HomeAssistant) -> None:
+    """Test an image shared with another holder is only removed once unused."""
+    cache = async_get_image_cache(hass)
+    digest, _ = await cache.async_store_bytes(b"image")
+    remove_holder = cache.async_add_holder(lambda: [digest])
+
+    await cache.async_remove(digest)
+    assert await cache.async_contains(digest)
+
+    remove_holder()
+    await cache.async_remove(digest)
+    assert not await cache.async_contains(digest)
@@ -0,0 +1,44 @@
+"""Tests for setting up and removing Malaysia Weather entries."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+
+from custom_components.malaysia_weather.const import (
+    DOMAIN,
+    EARTHQUAKE_URL,
+    SATELLITE_URLS,
+    WARNING_URL,
+)
+
+from .conftest import StandIn, async_setup_warnings_entry
+
+
+async def test_setup_warnings_entry(hass: HomeAssistant, stand_in: StandIn) -> None:
+    """Test setup fetches each dataset once and only the selected imagery."""
+    entry = await async_setup_warnings_entry(hass)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert stand_in.count(WARNING_URL) == 1
+    assert stand_in.count(EARTHQUAKE_URL) == 1
+    assert stand_in.count(SATELLITE_URLS["Satellite"]) == 1
+    assert stand_in.count(SATELLITE_URLS["Radar"]) == 0
+    assert hass.states.get("select.satellite_imagery").state == "Satellite"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.NOT_LOADED
+
+
+async def test_remove_warnings_entry(hass: HomeAssistant, stand_in: StandIn) -> None:
+    """Test removing the warnings entry deletes the cached imagery."""
+    entry = await async_setup_warnings_entry(hass)
+    cache = Path(hass.config.path(".storage", f"{DOMAIN}_images"))
+    assert any(cache.iterdir())
+
+    assert await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert not cache.exists()
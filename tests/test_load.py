@@ -0,0 +1,212 @@
+"""Load budgets for Malaysia Weather, from one to 200 locations.
+
+Timings vary between machines, so the budgets are counts that do not:
+requests, bytes and parses from the integration's metrics, state writes,
+and the peak memory traced while setting up. Time is simulated with a
+frozen clock, which moves only when the tests advance it.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+import tracemalloc
+from urllib.parse import urlsplit
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.components.weather import DOMAIN as WEATHER_DOMAIN
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+
+from custom_components.malaysia_weather.const import (
+    DOMAIN,
+    EARTHQUAKE_URL,
+    FORECAST_COORDINATOR,
+    FORECAST_URL,
+    SATELLITE_URLS,
+    WARNING_URL,
+)
+from custom_components.malaysia_weather.metrics import async_get_metrics
+
+from .conftest import (
+    StandIn,
+    async_setup_locations,
+    async_setup_warnings_entry,
+    async_unload,
+)
+
+LOCATION_COUNTS = [1, 10, 50, 200]
+
+# Midday in Malaysia, well clear of the morning forecast publication
+START = "2026-03-02 04:00:00+00:00"
+
+# Unrequested bytes added to every record, dropped by the column projection
+PADDING = 1024
+
+# A week of projected forecast records is about 1.9 KiB per location
+FORECAST_BYTES_PER_LOCATION = 2048
+# A weather entity and its sensors are written once each
+SETUP_STATE_WRITES_PER_LOCATION = 4
+# Traced peak while setting up, around 2.7 MiB for the first location and
+# 110 KiB for each further one
+SETUP_PEAK_BASE = 4 * 1024 * 1024
+SETUP_PEAK_PER_LOCATION = 160 * 1024
+# Returning memoized forecasts should allocate next to nothing
+FORECAST_DAILY_PEAK = 16 * 1024
+
+# Quiet warnings and earthquakes back off from five minutes, and unchanged
+# imagery is revalidated every five minutes without downloading it again
+HOURLY_REQUESTS = {"forecast": 0, "warnings": 3, "earthquake": 3, "Satellite": 12}
+# Unchanged datasets are an empty list each
+HOURLY_DATASET_BYTES = 2 * (HOURLY_REQUESTS["warnings"] + HOURLY_REQUESTS["earthquake"])
+# With half of the requests failing, no endpoint polls faster than its
+# five minute base interval
+HOURLY_REQUESTS_FAILING = 12
+
+
+async def _async_run_hour(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Advance the frozen clock through an hour, a minute at a time."""
+    for _ in range(60):
+        freezer.tick(timedelta(minutes=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+
+@pytest.mark.parametrize("count", LOCATION_COUNTS)
+async def test_setup_budget(
+    hass: HomeAssistant,
+    stand_in: StandIn,
+    freezer: FrozenDateTimeFactory,
+    count: int,
+) -> None:
+    """Test setup fetches and parses the forecast once within its budgets."""
+    freezer.move_to(START)
+    stand_in.padding = PADDING
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        entries = await async_setup_locations(hass, stand_in, count)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    metrics = async_get_metrics(hass)
+    forecast = metrics.named("forecast")
+    assert stand_in.count(FORECAST_URL) == forecast.requests == 1
+    assert forecast.parses == 1
+    assert forecast.bytes == stand_in.sent[urlsplit(FORECAST_URL).path]
+    assert forecast.bytes <= FORECAST_BYTES_PER_LOCATION * count
+    assert (
+        sum(metrics.state_writes.values()) <= SETUP_STATE_WRITES_PER_LOCATION * count
+    )
+    assert peak <= SETUP_PEAK_BASE + SETUP_PEAK_PER_LOCATION * count
+
+    await async_unload(hass, entries)
+
+
+@pytest.mark.parametrize("count", LOCATION_COUNTS)
+async def test_hourly_budget(
+    hass: HomeAssistant,
+    stand_in: StandIn,
+    freezer: FrozenDateTimeFactory,
+    count: int,
+) -> None:
+    """Test an hour of polling costs the same for any number of locations."""
+    freezer.move_to(START)
+    entries = await async_setup_locations(hass, stand_in, count)
+    entries.append(await async_setup_warnings_entry(hass))
+    metrics = async_get_metrics(hass)
+    before = {
+        name: (metrics.named(name).requests, metrics.named(name).parses)
+        for name in HOURLY_REQUESTS
+    }
+    stand_in.sent.clear()
+    metrics.state_writes.clear()
+
+    await _async_run_hour(hass, freezer)
+
+    for name, (requests, parses) in before.items():
+        endpoint = metrics.named(name)
+        assert endpoint.requests - requests == HOURLY_REQUESTS[name], name
+        if name != "Satellite":
+            assert endpoint.parses - parses == HOURLY_REQUESTS[name], name
+    # Imagery is only revalidated, never downloaded again
+    assert metrics.named("Satellite").not_modified == HOURLY_REQUESTS["Satellite"]
+    assert urlsplit(SATELLITE_URLS["Satellite"]).path not in stand_in.sent
+    assert sum(stand_in.sent.values()) == HOURLY_DATASET_BYTES
+    # Nothing changed, so no location entity was written again
+    assert not any(
+        entity_id.startswith(f"{WEATHER_DOMAIN}.")
+        for entity_id in metrics.state_writes
+    )
+
+    await async_unload(hass, entries)
+
+
+@pytest.mark.parametrize("count", LOCATION_COUNTS)
+async def test_forecast_daily_budget(
+    hass: HomeAssistant, stand_in: StandIn, no_response_memo: None, count: int
+) -> None:
+    """Test daily forecasts are built once per location and survive refreshes."""
+    entries = await async_setup_locations(hass, stand_in, count)
+    entities = [
+        hass.data[WEATHER_DOMAIN].get_entity(entity_id)
+        for entity_id in hass.states.async_entity_ids(WEATHER_DOMAIN)
+    ]
+    assert len(entities) == count
+    forecasts = [await entity.async_forecast_daily() for entity in entities]
+
+    tracemalloc.start()
+    try:
+        for _ in range(10):
+            for entity, forecast in zip(entities, forecasts):
+                assert await entity.async_forecast_daily() is forecast
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak <= FORECAST_DAILY_PEAK
+
+    # An unchanged payload keeps the forecasts already built
+    await hass.data[DOMAIN][FORECAST_COORDINATOR].async_refresh()
+    await hass.async_block_till_done()
+    assert async_get_metrics(hass).named("forecast").parses == 2
+    for entity, forecast in zip(entities, forecasts):
+        assert await entity.async_forecast_daily() is forecast
+
+    await async_unload(hass, entries)
+
+
+async def test_error_rate_budget(
+    hass: HomeAssistant, stand_in: StandIn, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test failing requests are counted, bounded and keep entities available."""
+    freezer.move_to(START)
+    entries = await async_setup_locations(hass, stand_in, 10)
+    entries.append(await async_setup_warnings_entry(hass))
+    metrics = async_get_metrics(hass)
+    before = {name: metrics.named(name).requests for name in HOURLY_REQUESTS}
+    stand_in.error_rate = 0.5
+
+    await _async_run_hour(hass, freezer)
+
+    for name, url in (
+        ("warnings", WARNING_URL),
+        ("earthquake", EARTHQUAKE_URL),
+        ("Satellite", SATELLITE_URLS["Satellite"]),
+    ):
+        endpoint, path = metrics.named(name), urlsplit(url).path
+        assert stand_in.errors[path], name
+        assert endpoint.errors == stand_in.errors[path], name
+        assert endpoint.requests - before[name] <= HOURLY_REQUESTS_FAILING, name
+    assert not [
+        entity_id
+        for entity_id in hass.states.async_entity_ids()
+        if hass.states.get(entity_id).state == STATE_UNAVAILABLE
+    ]
+
+    await async_unload(hass, entries)
@@ -0,0 +1,34 @@
+"""Tests for the Malaysia Weather data models."""
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.malaysia_weather.models import parse_warnings
+
+WARNING = {
+    "warning_issue": {"issued": "2026-01-01T06:00:00"},
+    "valid_from": "2026-01-01T06:00:00",
+    "valid_to": "2026-01-01T18:00:00",
+    "heading_en": "Thunderstorms Warning",
+    "text_en": "Thunderstorms over Kedah",
+    "instruction_en": None,
+}
+NOW = datetime(2026, 1, 1, 12, tzinfo=dt_util.get_time_zone("Asia/Kuala_Lumpur"))
+
+
+def test_warning_set_equal_for_same_payload() -> None:
+    """Test identical payloads parse to equal warning sets."""
+    assert parse_warnings([WARNING], NOW) == parse_warnings([dict(WARNING)], NOW)
+
+
+@pytest.mark.parametrize(
+    "change",
+    [{"valid_to": "2026-01-01T21:00:00"}, {"text_en": "Thunderstorms over Perlis"}],
+)
+def test_warning_set_changes_under_same_key(change: dict[str, str]) -> None:
+    """Test a warning revised under the same key makes the sets differ."""
+    assert parse_warnings([WARNING], NOW) != parse_warnings([{**WARNING, **change}], NOW)
@@ -0,0 +1,77 @@
+"""Tests for the Malaysia Weather weather platform."""
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.components.weather import DOMAIN as WEATHER_DOMAIN
+from homeassistant.core import HomeAssistant
+
+from custom_components.malaysia_weather.const import (
+    DOMAIN,
+    FORECAST_COORDINATOR,
+    FORECAST_URL,
+)
+from custom_components.malaysia_weather.metrics import async_get_metrics
+
+from .conftest import FORECAST_DAYS, StandIn, async_setup_locations, async_unload
+
+
+@pytest.mark.parametrize("count", [1, 10, 50])
+async def test_requests_per_refresh(
+    hass: HomeAssistant, stand_in: StandIn, no_response_memo: None, count: int
+) -> None:
+    """Test every location shares one forecast request per refresh."""
+    entries = await async_setup_locations(hass, stand_in, count)
+
+    assert len(hass.states.async_entity_ids(WEATHER_DOMAIN)) == count
+    assert stand_in.count(FORECAST_URL, "morning_forecast") == 1
+
+    await hass.data[DOMAIN][FORECAST_COORDINATOR].async_refresh()
+
+    assert stand_in.count(FORECAST_URL, "morning_forecast") == 2
+    assert async_get_metrics(hass).named("forecast").requests == 2
+
+    await async_unload(hass, entries)
+
+
+async def test_refresh_failure_serves_cached_forecast(
+    hass: HomeAssistant, stand_in: StandIn, no_response_memo: None
+) -> None:
+    """Test a failed refresh keeps the forecast available and marks it stale."""
+    entries = await async_setup_locations(hass, stand_in, 1)
+    (entity_id,) = hass.states.async_entity_ids(WEATHER_DOMAIN)
+    assert hass.states.get(entity_id).attributes["stale"] is False
+
+    stand_in.failing.add("/weather/forecast")
+    await hass.data[DOMAIN][FORECAST_COORDINATOR].async_refresh()
+    await hass.async_block_till_done()
+
+    state = hass.states.get(entity_id)
+    assert state.state == "lightning-rainy"
+    assert state.attributes["stale"] is True
+
+    await async_unload(hass, entries)
+
+
+async def test_forecast_daily(hass: HomeAssistant, stand_in: StandIn) -> None:
+    """Test the daily forecast covers every day and is built once."""
+    entries = await async_setup_locations(hass, stand_in, 1)
+    (entity_id,) = hass.states.async_entity_ids(WEATHER_DOMAIN)
+
+    response = await hass.services.async_call(
+        WEATHER_DOMAIN,
+        "get_forecasts",
+        {"entity_id": entity_id, "type": "daily"},
+        blocking=True,
+        return_response=True,
+    )
+    forecast = response[entity_id]["forecast"]
+    assert len(forecast) == FORECAST_DAYS
+    assert forecast[0]["temperature"] == 32
+    assert forecast[0]["templow"] == 24
+    assert forecast[0]["condition"] == "lightning-rainy"
+
+    entity = hass.data[WEATHER_DOMAIN].get_entity(entity_id)
+    assert await entity.async_forecast_daily() is await entity.async_forecast_daily()
+
+    await async_unload(hass, entries)